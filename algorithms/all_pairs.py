@@ -0,0 +1,138 @@
+from .base import IAlgorithm
+from .graph import CompactGraph
+from .pathfinding import dijkstra_tree
+from .apsp_cache import apsp_cache, path_from_matrices
+from concurrent.futures import ProcessPoolExecutor
+import os
+import math
+import numpy as np
+
+_worker_graph = None
+
+class NegativeCycleError(ValueError):
+    pass
+
+def _init_worker(G):
+    global _worker_graph
+    _worker_graph = G
+
+def _rows(sources):
+    # Runs in a worker process; the graph is sent once via the initializer
+    return _dijkstra_rows(_worker_graph, sources)
+
+def _dijkstra_rows(G, sources):
+    out = []
+    for s in sources:
+        dist, parent = dijkstra_tree(G, s)
+        out.append((s, np.array(dist, dtype=np.float64), np.array([-1 if p is None else p for p in parent], dtype=np.int64)))
+    return out
+
+class AllPairs(IAlgorithm):
+    """mode: "dense" (NumPy Floyd-Warshall), "sparse" (Dijkstra per source in a process pool) or "auto"."""
+
+    MODES = ("auto", "dense", "sparse")
+
+    def __init__(self, mode: str = "auto", dense_limit: int = 3000, density: float = 0.05, workers: int = None, chunk_size: int = 64, max_nodes: int = 5000):
+        if mode not in self.MODES:
+            raise ValueError(f"Chế độ APSP không hợp lệ: {mode}")
+        self.mode = mode
+        # Two n x n matrices: 5000 nodes is already ~300 MB on disk
+        self.max_nodes = max_nodes
+        self.dense_limit = dense_limit
+        self.density = density
+        self.workers = workers
+        self.chunk_size = chunk_size
+
+    def execute(self, G, start_node, end_node):
+        if not isinstance(G, CompactGraph):
+            G = CompactGraph.from_networkx(G)
+
+        if self.max_nodes and G.num_nodes > self.max_nodes:
+            return self._error(f"Lỗi: APSP chỉ hỗ trợ đồ thị tối đa {self.max_nodes} đỉnh (đồ thị có {G.num_nodes} đỉnh).")
+        try:
+            entry = self.matrices(G)
+        except NegativeCycleError:
+            return self._error("Lỗi: Đồ thị có chu trình âm!")
+        path, cost = path_from_matrices(entry, G.index[start_node], G.index[end_node], as_int=G.weights.typecode != 'd')
+        return {
+            "path_nodes": [G.names[u] for u in path],
+            "cost": cost if cost != math.inf else 0,
+            "type": "path",
+            "msg": f"APSP (ma trận {G.num_nodes}x{G.num_nodes}, đã cache)"
+        }
+
+    def _error(self, msg):
+        return {
+            "path_nodes": [],
+            "cost": 0,
+            "type": "path",
+            "msg": msg
+        }
+
+    def invalidate(self, graph_version=None) -> None:
+        apsp_cache.invalidate(graph_version)
+
+    def matrices(self, G):
+        entry = apsp_cache.load(G)
+        if entry is not None:
+            return entry
+        mode = self.mode
+        if mode == "auto":
+            n = G.num_nodes
+            dense = n <= self.dense_limit and G.num_edges >= self.density * n * n
+            mode = "dense" if dense or G.has_negative else "sparse"
+        if mode == "sparse" and G.has_negative:
+            raise ValueError("APSP dạng sparse (Dijkstra) không hỗ trợ trọng số âm.")
+        dist, pred = apsp_cache.allocate(G)
+        try:
+            if mode == "dense":
+                self._floyd_warshall(G, dist, pred)
+            else:
+                self._repeated_dijkstra(G, dist, pred)
+            return apsp_cache.commit(G, dist, pred)
+        except BaseException:
+            apsp_cache.discard(dist, pred)
+            raise
+
+    def _floyd_warshall(self, G, dist_out, pred_out):
+        n = G.num_nodes
+        src, dst, w = G.arc_arrays()
+        dist = np.full((n, n), np.inf)
+        np.minimum.at(dist, (src, dst), w)
+        pred = np.full((n, n), -1, dtype=pred_out.dtype)
+        has_arc = dist < np.inf
+        pred[has_arc] = np.nonzero(has_arc)[0]
+        diag = np.arange(n)
+        # A negative self-loop is a negative cycle
+        if (dist[diag, diag] < 0).any():
+            raise NegativeCycleError()
+        dist[diag, diag] = 0
+        pred[diag, diag] = diag
+        via = np.empty((n, n))
+        better = np.empty((n, n), dtype=bool)
+        for k in range(n):
+            # Row/column k is unchanged at step k, so in-place update is safe
+            np.add(dist[:, k, None], dist[None, k, :], out=via)
+            np.less(via, dist, out=better)
+            np.copyto(dist, via, where=better)
+            np.copyto(pred, pred[k], where=better)
+        if (dist[diag, diag] < 0).any():
+            raise NegativeCycleError()
+        dist_out[:] = dist
+        pred_out[:] = pred
+
+    def _repeated_dijkstra(self, G, dist_out, pred_out):
+        n = G.num_nodes
+        chunks = [range(i, min(i + self.chunk_size, n)) for i in range(0, n, self.chunk_size)]
+        workers = self.workers or os.cpu_count() or 1
+        if workers <= 1 or len(chunks) <= 1:
+            self._write_rows((_dijkstra_rows(G, c) for c in chunks), dist_out, pred_out)
+            return
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(G,)) as pool:
+            self._write_rows(pool.map(_rows, chunks), dist_out, pred_out)
+
+    def _write_rows(self, results, dist_out, pred_out):
+        for batch in results:
+            for s, dist, pred in batch:
+                dist_out[s] = dist
+                pred_out[s] = pred
@@ -0,0 +1,156 @@
+import os
+import tempfile
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class APSPCache:
+    """Memory-mapped APSP matrices, indexed by G.version and stored by G.fingerprint()."""
+
+    def __init__(self, directory: str = None, max_entries: int = 4, max_disk_bytes: int = None):
+        self.directory = directory or os.getenv("APSP_CACHE_DIR", os.path.join(tempfile.gettempdir(), "ltdt_apsp"))
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes if max_disk_bytes is not None else int(os.getenv("APSP_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _paths(self, fingerprint: str):
+        return (os.path.join(self.directory, f"{fingerprint}.dist.npy"),
+                os.path.join(self.directory, f"{fingerprint}.pred.npy"))
+
+    def get(self, G):
+        if G.version is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(G.version)
+            if entry is not None:
+                self._entries.move_to_end(G.version)
+            return entry
+
+    def load(self, G):
+        """Like get(), but also checks the disk by fingerprint."""
+        entry = self.get(G)
+        if entry is not None:
+            return entry
+        dist_path, pred_path = self._paths(G.fingerprint())
+        if not (os.path.exists(dist_path) and os.path.exists(pred_path)):
+            return None
+        try:
+            entry = (np.load(dist_path, mmap_mode='r'), np.load(pred_path, mmap_mode='r'))
+        except (OSError, ValueError) as e:
+            logger.warning(f"APSP cache unreadable, recomputing: {e}")
+            return None
+        self._touch(dist_path, pred_path)
+        self._remember(G, entry)
+        return entry
+
+    def allocate(self, G):
+        os.makedirs(self.directory, exist_ok=True)
+        n = G.num_nodes
+        dist_path, pred_path = self._paths(G.fingerprint())
+        # Unique temp name so concurrent runs never share a file
+        suffix = f".{uuid.uuid4().hex}.tmp"
+        dist = np.lib.format.open_memmap(dist_path + suffix, mode='w+', dtype=np.float64, shape=(n, n))
+        try:
+            pred = np.lib.format.open_memmap(pred_path + suffix, mode='w+', dtype=np.int32 if n < 2 ** 31 else np.int64, shape=(n, n))
+        except BaseException:
+            self.discard(dist)
+            raise
+        return dist, pred
+
+    def discard(self, *arrays) -> None:
+        for arr in arrays:
+            try:
+                os.remove(arr.filename)
+            except OSError:
+                pass
+
+    def commit(self, G, dist, pred):
+        dist.flush()
+        pred.flush()
+        dist_path, pred_path = self._paths(G.fingerprint())
+        os.replace(dist.filename, dist_path)
+        os.replace(pred.filename, pred_path)
+        entry = (np.load(dist_path, mmap_mode='r'), np.load(pred_path, mmap_mode='r'))
+        self._remember(G, entry)
+        self._prune_disk(keep=(dist_path, pred_path))
+        return entry
+
+    def _touch(self, *paths) -> None:
+        # mtime marks recent use for _prune_disk
+        for path in paths:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+
+    def _prune_disk(self, keep=()) -> None:
+        """Delete least recently used matrix pairs until the directory fits max_disk_bytes."""
+        pairs = {}
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if not (name.endswith(".dist.npy") or name.endswith(".pred.npy")):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            used, size, paths = pairs.get(name[:-9], (0.0, 0, []))
+            pairs[name[:-9]] = (max(used, st.st_mtime), size + st.st_size, paths + [path])
+
+        total = sum(size for _, size, _ in pairs.values())
+        for used, size, paths in sorted(pairs.values(), key=lambda p: p[0]):
+            if total <= self.max_disk_bytes:
+                break
+            if any(path in keep for path in paths):
+                continue
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+
+    def _remember(self, G, entry):
+        if G.version is None:
+            return
+        with self._lock:
+            self._entries[G.version] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, graph_version=None) -> None:
+        # Files on disk are content-addressed, so only the index is dropped
+        with self._lock:
+            for version in [v for v in self._entries if graph_version is None or v[0] == graph_version]:
+                del self._entries[version]
+
+    def lookup(self, G, s: int, t: int):
+        entry = self.get(G)
+        if entry is None:
+            return None
+        return path_from_matrices(entry, s, t, as_int=G.weights.typecode != 'd')
+
+def path_from_matrices(entry, s: int, t: int, as_int: bool = False):
+    dist, pred = entry
+    d = dist[s, t]
+    if d == np.inf:
+        return [], np.inf
+    row = pred[s]
+    path = [t]
+    curr = t
+    while curr != s:
+        curr = int(row[curr])
+        path.append(curr)
+    path.reverse()
+    return path, int(d) if as_int else d.item()
+
+apsp_cache = APSPCache()
@@ -0,0 +1,149 @@
+from .base import IAlgorithm
+from .graph import CompactGraph
+from .pathfinding import dijkstra_tree, _trace_path
+from .apsp_cache import apsp_cache
+from array import array
+from collections import OrderedDict
+import heapq
+import math
+import threading
+
+class LandmarkIndex:
+    """ALT distance tables: d(L, v) and d(v, L) for every landmark L."""
+
+    def __init__(self, G: CompactGraph, num_landmarks: int = 8):
+        self.landmarks = []
+        self.dist_from = []
+        self.dist_to = []
+        n = G.num_nodes
+        if n == 0:
+            return
+        R = G.reverse()
+        # Farthest-landmark selection; unreachable nodes (other components) come first
+        closest = [math.inf] * n
+        candidate = 0
+        for _ in range(min(num_landmarks, n)):
+            landmark = candidate
+            d_from, _ = dijkstra_tree(G, landmark)
+            d_to = d_from if R is G else dijkstra_tree(R, landmark)[0]
+            self.landmarks.append(landmark)
+            self.dist_from.append(array('d', d_from))
+            self.dist_to.append(array('d', d_to))
+
+            best, candidate = -1.0, None
+            for v in range(n):
+                d = d_from[v]
+                if d < closest[v]:
+                    closest[v] = d
+                score = closest[v]
+                if score == math.inf:
+                    score = math.inf if v not in self.landmarks else -1.0
+                if score > best:
+                    best, candidate = score, v
+            if candidate is None or best <= 0:
+                break
+
+    def heuristic(self, t: int):
+        """Lower bound h(v) <= d(v, t) from the triangle inequality."""
+        terms = []
+        for d_from, d_to in zip(self.dist_from, self.dist_to):
+            lt, tl = d_from[t], d_to[t]
+            terms.append((d_from, d_to, lt if lt != math.inf else None, tl if tl != math.inf else None))
+
+        def h(v):
+            best = 0
+            for d_from, d_to, lt, tl in terms:
+                lv = d_from[v]
+                if lt is None:
+                    # L reaches v but not t, so v cannot reach t
+                    if lv != math.inf:
+                        return math.inf
+                elif lv != math.inf and lt - lv > best:
+                    best = lt - lv
+                vl = d_to[v]
+                if tl is not None and vl != math.inf and vl - tl > best:
+                    best = vl - tl
+            return best
+        return h
+
+class AStar(IAlgorithm):
+    """A* with the ALT heuristic; landmark tables are cached per G.version."""
+
+    def __init__(self, num_landmarks: int = 8, max_indexes: int = 2):
+        self.num_landmarks = num_landmarks
+        self.max_indexes = max_indexes
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def execute(self, G, start_node, end_node):
+        if not isinstance(G, CompactGraph):
+            G = CompactGraph.from_networkx(G)
+
+        s, t = G.index[start_node], G.index[end_node]
+        cached = apsp_cache.lookup(G, s, t)
+        if cached is not None:
+            path, cost = cached
+            return self._result([G.names[u] for u in path], cost, "đọc từ cache APSP")
+
+        index = self.landmark_index(G)
+        h = index.heuristic(t) if index is not None else (lambda v: 0)
+
+        offsets, targets, weights = G.offsets, G.targets, G.weights
+        dist = {s: 0}
+        parent = {s: None}
+        h_cache = {s: h(s)}
+        pq = [(h_cache[s], 0, s)]
+        settled = 0
+        while pq:
+            _, current_dist, u = heapq.heappop(pq)
+            if current_dist > dist[u]:
+                continue
+            settled += 1
+            if u == t:
+                break
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                new_dist = current_dist + weights[k]
+                if new_dist < dist.get(v, math.inf):
+                    dist[v] = new_dist
+                    parent[v] = u
+                    hv = h_cache.get(v)
+                    if hv is None:
+                        hv = h_cache[v] = h(v)
+                    if hv != math.inf:
+                        heapq.heappush(pq, (new_dist + hv, new_dist, v))
+
+        path = []
+        if t in dist:
+            path = [G.names[u] for u in _trace_path(parent, t)]
+        return self._result(path, dist.get(t, math.inf), f"xét {settled} đỉnh")
+
+    def _result(self, path, cost, detail):
+        return {
+            "path_nodes": path,
+            "cost": cost if cost != math.inf else 0,
+            "type": "path",
+            "msg": f"A* ALT (Thủ công) - {detail}"
+        }
+
+    def invalidate(self, graph_version=None) -> None:
+        with self._lock:
+            for version in [v for v in self._indexes if graph_version is None or v[0] == graph_version]:
+                del self._indexes[version]
+
+    def landmark_index(self, G):
+        # No landmarks for unversioned graphs or negative weights
+        if G.version is None or G.has_negative:
+            return None
+        with self._lock:
+            index = self._indexes.get(G.version)
+            if index is not None:
+                self._indexes.move_to_end(G.version)
+                return index
+        # Build outside the lock so other sessions don't wait
+        index = LandmarkIndex(G, self.num_landmarks)
+        with self._lock:
+            self._indexes[G.version] = index
+            while len(self._indexes) > self.max_indexes:
+                self._indexes.popitem(last=False)
+        return index
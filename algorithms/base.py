@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
+from typing import Union
 import networkx as nx
+from .graph import CompactGraph
 
 class IAlgorithm(ABC):
     @abstractmethod
-    def execute(self, G: nx.Graph, start_node: str, end_node: str) -> dict:
+    def execute(self, G: Union[nx.Graph, CompactGraph], start_node: str, end_node: str) -> dict:
         pass
@@ -0,0 +1,232 @@
+from array import array
+import hashlib
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+
+class CompactGraph:
+    """CSR graph: neighbours of id u are targets/weights[offsets[u]:offsets[u+1]].
+    Undirected edges are stored in both directions."""
+
+    __slots__ = ("names", "index", "offsets", "targets", "weights", "is_directed", "num_edges", "has_negative", "version", "_reverse")
+
+    def __init__(self, names: List[str], offsets: array, targets: array, weights: array, is_directed: bool = True, num_edges: int = 0, index: Optional[Dict[str, int]] = None):
+        self.names = names
+        self.index = index if index is not None else {name: i for i, name in enumerate(names)}
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.is_directed = is_directed
+        self.num_edges = num_edges
+        self.has_negative = any(w < 0 for w in weights)
+        # Cache key set by GraphService: (graph_key, is_directed, is_weighted, build serial)
+        self.version = None
+        self._reverse = None if is_directed else self
+
+    @classmethod
+    def from_lists(cls, nodes: List[str], edges: List[Dict[str, Any]], is_directed: bool = True, is_weighted: bool = True) -> "CompactGraph":
+        names: List[str] = []
+        index: Dict[str, int] = {}
+
+        def intern(name):
+            i = index.get(name)
+            if i is None:
+                i = len(names)
+                index[name] = i
+                names.append(name)
+            return i
+
+        for n in nodes:
+            intern(n)
+
+        # Duplicates keep the first position and the last weight, like nx.Graph.add_edge
+        pairs: Dict[Tuple[int, int], Any] = {}
+        for e in edges:
+            u = e.get('source')
+            v = e.get('target')
+            if not (u and v):
+                continue
+            w = e.get('weight', 1) if is_weighted else 1
+            ui, vi = intern(u), intern(v)
+            if not is_directed and vi < ui:
+                ui, vi = vi, ui
+            pairs[(ui, vi)] = w if isinstance(w, int) else float(w)
+
+        n = len(names)
+        degree = [0] * (n + 1)
+        for ui, vi in pairs:
+            degree[ui + 1] += 1
+            if not is_directed and ui != vi:
+                degree[vi + 1] += 1
+        for i in range(n):
+            degree[i + 1] += degree[i]
+
+        cursor = degree[:n]
+        size = degree[n]
+        targets = [0] * size
+        weights = [0] * size
+        for (ui, vi), w in pairs.items():
+            k = cursor[ui]
+            targets[k] = vi
+            weights[k] = w
+            cursor[ui] = k + 1
+            if not is_directed and ui != vi:
+                k = cursor[vi]
+                targets[k] = ui
+                weights[k] = w
+                cursor[vi] = k + 1
+
+        w_code = 'q' if all(type(w) is int for w in pairs.values()) else 'd'
+        return cls(
+            names,
+            array('q', degree),
+            array('i' if n < 2 ** 31 else 'q', targets),
+            array(w_code, weights),
+            is_directed=is_directed,
+            num_edges=len(pairs),
+            index=index,
+        )
+
+    @classmethod
+    def from_columns(cls, names: List[str], src, dst, weights=None, is_directed: bool = True, is_weighted: bool = True, index: Optional[Dict[str, int]] = None) -> "CompactGraph":
+        """Build the CSR from interned id columns with NumPy; same result as from_lists."""
+        import numpy as np
+        n = len(names)
+        u = np.asarray(src, dtype=np.int64)
+        v = np.asarray(dst, dtype=np.int64)
+        if weights is None or not is_weighted:
+            w = np.ones(len(u), dtype=np.int64)
+        else:
+            w = np.asarray(weights)
+            w = w.astype(np.int64) if np.issubdtype(w.dtype, np.integer) or w.size == 0 else w.astype(np.float64)
+        if not is_directed:
+            u, v = np.minimum(u, v), np.maximum(u, v)
+
+        key = u * n + v
+        _, first = np.unique(key, return_index=True)
+        _, last_rev = np.unique(key[::-1], return_index=True)
+        order = np.argsort(first, kind="stable")
+        first = first[order]
+        last = len(key) - 1 - last_rev[order]
+        pu, pv, pw = u[first], v[first], w[last]
+
+        if is_directed:
+            au, av, aw = pu, pv, pw
+        else:
+            # Forward then reverse arc per pair (no reverse for self-loops), as in from_lists
+            keep = np.stack([np.ones(len(pu), dtype=bool), pu != pv], axis=1).reshape(-1)
+            au = np.stack([pu, pv], axis=1).reshape(-1)[keep]
+            av = np.stack([pv, pu], axis=1).reshape(-1)[keep]
+            aw = np.repeat(pw, 2)[keep]
+
+        by_source = np.argsort(au, kind="stable")
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(au, minlength=n), out=offsets[1:])
+
+        def to_array(code, values):
+            arr = array(code)
+            arr.frombytes(np.ascontiguousarray(values, dtype=arr.typecode).tobytes())
+            return arr
+
+        return cls(
+            names,
+            to_array('q', offsets),
+            to_array('i' if n < 2 ** 31 else 'q', av[by_source]),
+            to_array('q' if aw.dtype == np.int64 else 'd', aw[by_source]),
+            is_directed=is_directed,
+            num_edges=len(pu),
+            index=index,
+        )
+
+    @classmethod
+    def from_networkx(cls, G) -> "CompactGraph":
+        edges = [{"source": u, "target": v, "weight": d.get('weight', 1)} for u, v, d in G.edges(data=True)]
+        return cls.from_lists(list(G.nodes()), edges, is_directed=G.is_directed())
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name) -> bool:
+        return name in self.index
+
+    def fingerprint(self) -> str:
+        """Content hash, stable across runs; keys the on-disk cache."""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(b"D" if self.is_directed else b"U")
+        h.update("\0".join(map(str, self.names)).encode("utf-8"))
+        for arr in (self.offsets, self.targets, self.weights):
+            h.update(arr.typecode.encode())
+            h.update(arr.tobytes())
+        return h.hexdigest()
+
+    def neighbors(self, u: int) -> array:
+        return self.targets[self.offsets[u]:self.offsets[u + 1]]
+
+    def reverse(self) -> "CompactGraph":
+        """Transposed graph, built once; an undirected graph is its own transpose."""
+        if self._reverse is None:
+            n = len(self.names)
+            offsets, targets, weights = self.offsets, self.targets, self.weights
+            degree = [0] * (n + 1)
+            for v in targets:
+                degree[v + 1] += 1
+            for i in range(n):
+                degree[i + 1] += degree[i]
+            cursor = degree[:n]
+            r_targets = array(targets.typecode, bytes(targets.itemsize * len(targets)))
+            r_weights = array(weights.typecode, bytes(weights.itemsize * len(weights)))
+            for u in range(n):
+                for k in range(offsets[u], offsets[u + 1]):
+                    v = targets[k]
+                    j = cursor[v]
+                    r_targets[j] = u
+                    r_weights[j] = weights[k]
+                    cursor[v] = j + 1
+            rev = CompactGraph(self.names, array('q', degree), r_targets, r_weights, is_directed=True, num_edges=self.num_edges, index=self.index)
+            rev._reverse = self
+            self._reverse = rev
+        return self._reverse
+
+    def _endpoint_arrays(self):
+        import numpy as np
+        n = len(self.names)
+        offsets = np.frombuffer(self.offsets, dtype=np.int64)
+        src = np.repeat(np.arange(n, dtype=np.int64), np.diff(offsets))
+        dst = np.frombuffer(self.targets, dtype=self.targets.typecode).astype(np.int64)
+        return src, dst
+
+    def arc_arrays(self):
+        """(src, dst, weight) arrays for every arc, weights as float64."""
+        import numpy as np
+        src, dst = self._endpoint_arrays()
+        w = np.frombuffer(self.weights, dtype=self.weights.typecode).astype(np.float64)
+        return src, dst, w
+
+    def edge_arrays(self):
+        """(src, dst, weight) arrays with each edge once, as in edges()."""
+        import numpy as np
+        src, dst = self._endpoint_arrays()
+        w = np.frombuffer(self.weights, dtype=self.weights.typecode)
+        if self.is_directed:
+            return src, dst, w.copy()
+        mask = src <= dst
+        return src[mask], dst[mask], w[mask]
+
+    def arcs(self) -> Iterator[Tuple[int, int, Any]]:
+        """All arcs in CSR order; undirected edges appear twice."""
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        for u in range(len(self.names)):
+            for k in range(offsets[u], offsets[u + 1]):
+                yield u, targets[k], weights[k]
+
+    def edges(self) -> Iterator[Tuple[int, int, Any]]:
+        """Each edge once, like G.edges(data=True)."""
+        if self.is_directed:
+            yield from self.arcs()
+            return
+        for u, v, w in self.arcs():
+            if u <= v:
+                yield u, v, w
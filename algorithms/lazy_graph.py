@@ -0,0 +1,56 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+AdjacencyFetcher = Callable[[List[str]], Dict[str, List[Tuple[str, Any]]]]
+
+
+class LazyGraph:
+    """nx.Graph-like adjacency fetched on demand, batch_size boundary nodes per round trip."""
+
+    def __init__(self, fetch: AdjacencyFetcher, is_directed: bool = True, is_weighted: bool = True, batch_size: int = 256):
+        self._fetch = fetch
+        self._is_directed = is_directed
+        self.is_weighted = is_weighted
+        self.batch_size = max(1, batch_size)
+        self._adj: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._boundary: "OrderedDict[str, None]" = OrderedDict()
+        self.fetches = 0
+
+    def is_directed(self) -> bool:
+        return self._is_directed
+
+    @property
+    def num_loaded(self) -> int:
+        return len(self._adj)
+
+    def __contains__(self, name) -> bool:
+        return name in self._adj or name in self._boundary
+
+    def __getitem__(self, name: str) -> Dict[str, Dict[str, Any]]:
+        adj = self._adj.get(name)
+        if adj is None:
+            self._load(name)
+            adj = self._adj[name]
+        return adj
+
+    def neighbors(self, name: str) -> Iterable[str]:
+        return iter(self[name])
+
+    def _load(self, name: str) -> None:
+        self._boundary.pop(name, None)
+        batch = [name]
+        while self._boundary and len(batch) < self.batch_size:
+            batch.append(self._boundary.popitem(last=False)[0])
+
+        rows = self._fetch(batch)
+        self.fetches += 1
+        for u in batch:
+            adj: Dict[str, Dict[str, Any]] = {}
+            for v, w in rows.get(u, ()):
+                # Duplicate edges keep the last weight, like nx.Graph.add_edge
+                adj[v] = {'weight': w if self.is_weighted else 1}
+                if v not in self._adj:
+                    self._boundary[v] = None
+            self._adj[u] = adj
+        for u in batch:
+            self._boundary.pop(u, None)
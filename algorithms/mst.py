@@ -1,8 +1,14 @@
 from .base import IAlgorithm
+from .graph import CompactGraph
+from .structures import DisjointSet, IndexedHeap
 import heapq
+import numpy as np
 
 class Prim(IAlgorithm):
     def execute(self, G, start_node, end_node=None):
+        if isinstance(G, CompactGraph):
+            return self._execute_compact(G, start_node)
+
         mst_edges = []
         total_cost = 0
         visited = set()
@@ -28,6 +34,35 @@ class Prim(IAlgorithm):
                             w = attr.get('weight', 1)
                             heapq.heappush(edges, (w, v, neighbor))
                             
+        return self._result(mst_edges, total_cost)
+
+    def _execute_compact(self, G, start_node):
+        mst_edges = []
+        total_cost = 0
+        if G.num_nodes == 0:
+            return self._result(mst_edges, total_cost)
+
+        offsets, targets, weights, names = G.offsets, G.targets, G.weights, G.names
+        s = G.index[start_node] if start_node else 0
+        in_tree = bytearray(G.num_nodes)
+        # Each vertex outside the tree is in the heap at most once
+        heap = IndexedHeap()
+        heap.push_or_decrease(s, 0)
+        link = {s: None}
+        while heap:
+            weight, v = heap.pop()
+            in_tree[v] = 1
+            u = link.pop(v)
+            if u is not None:
+                mst_edges.append((names[u], names[v]))
+                total_cost += weight
+            for k in range(offsets[v], offsets[v + 1]):
+                neighbor = targets[k]
+                if not in_tree[neighbor] and heap.push_or_decrease(neighbor, weights[k]):
+                    link[neighbor] = v
+        return self._result(mst_edges, total_cost)
+
+    def _result(self, mst_edges, total_cost):
         return {
             "mst_edges": mst_edges,
             "cost": total_cost,
@@ -37,39 +72,96 @@ class Prim(IAlgorithm):
 
 class Kruskal(IAlgorithm):
     def execute(self, G, start_node=None, end_node=None):
+        if not isinstance(G, CompactGraph):
+            G = CompactGraph.from_networkx(G)
+
         mst_edges = []
         total_cost = 0
-        edges = []
-        
-        for u, v, attr in G.edges(data=True):
-            edges.append((attr.get('weight', 1), u, v))
-        
-        edges.sort()
-        
-        parent = {node: node for node in G.nodes()}
-        
-        def find(i):
-            if parent[i] == i:
-                return i
-            parent[i] = find(parent[i])
-            return parent[i]
-            
-        def union(i, j):
-            root_i = find(i)
-            root_j = find(j)
-            if root_i != root_j:
-                parent[root_i] = root_j
-                return True
-            return False
-            
-        for weight, u, v in edges:
-            if union(u, v):
-                mst_edges.append((u, v))
+        names = G.names
+        n = G.num_nodes
+        src, dst, w = G.edge_arrays()
+        order = np.argsort(w, kind='stable')
+
+        ds = DisjointSet(n)
+        for u, v, weight in zip(src[order].tolist(), dst[order].tolist(), w[order].tolist()):
+            if ds.union(u, v):
+                mst_edges.append((names[u], names[v]))
                 total_cost += weight
-                
+                # Spanning tree complete
+                if len(mst_edges) == n - 1:
+                    break
+        return self._result(mst_edges, total_cost)
+
+    def _result(self, mst_edges, total_cost):
         return {
             "mst_edges": mst_edges,
             "cost": total_cost,
             "type": "mst",
             "msg": "Thuật toán Kruskal"
         }
+
+
+class Boruvka(IAlgorithm):
+    """Vectorized Borůvka; disconnected graphs yield a minimum spanning forest."""
+
+    def execute(self, G, start_node=None, end_node=None):
+        if not isinstance(G, CompactGraph):
+            G = CompactGraph.from_networkx(G)
+
+        n = G.num_nodes
+        src, dst, w = G.edge_arrays()
+        m = len(w)
+        # Rank by (weight, index) so ties never form a cycle
+        order = np.argsort(w, kind='stable')
+        rank = np.empty(m, dtype=np.int64)
+        rank[order] = np.arange(m, dtype=np.int64)
+
+        comp = np.arange(n, dtype=np.int64)
+        alive = np.arange(m, dtype=np.int64)
+        chosen = []
+        while alive.size:
+            cu, cv = comp[src[alive]], comp[dst[alive]]
+            crossing = cu != cv
+            alive, cu, cv = alive[crossing], cu[crossing], cv[crossing]
+            if not alive.size:
+                break
+
+            best = np.full(n, m, dtype=np.int64)
+            r = rank[alive]
+            np.minimum.at(best, cu, r)
+            np.minimum.at(best, cv, r)
+            comps = np.nonzero(best < m)[0]
+            best_edge = order[best[comps]]
+            bu, bv = comp[src[best_edge]], comp[dst[best_edge]]
+            other = np.where(bu == comps, bv, bu)
+
+            hook = np.arange(n, dtype=np.int64)
+            hook[comps] = other
+            # Mutual picks: the smaller id becomes the root
+            mutual = (hook[other] == comps) & (comps < other)
+            hook[comps[mutual]] = comps[mutual]
+            chosen.append(np.unique(best_edge))
+
+            while True:
+                jumped = hook[hook]
+                if np.array_equal(jumped, hook):
+                    break
+                hook = jumped
+            comp = hook[comp]
+
+        picked = np.concatenate(chosen) if chosen else np.empty(0, dtype=np.int64)
+        names = G.names
+        mst_edges = [(names[u], names[v]) for u, v in zip(src[picked].tolist(), dst[picked].tolist())]
+
+        roots = np.unique(comp)
+        per_root = np.zeros(n, dtype=w.dtype)
+        np.add.at(per_root, comp[src[picked]], w[picked])
+        component_costs = per_root[roots].tolist()
+
+        return {
+            "mst_edges": mst_edges,
+            "cost": sum(component_costs),
+            "component_costs": component_costs,
+            "type": "mst",
+            "msg": f"Thuật toán Borůvka - rừng khung {len(component_costs)} thành phần"
+        }
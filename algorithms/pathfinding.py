@@ -1,12 +1,113 @@
 from .base import IAlgorithm
+from .graph import CompactGraph
+from .structures import IndexedHeap
+from .apsp_cache import apsp_cache
 import heapq
 import math
+import threading
+import numpy as np
+from collections import deque, OrderedDict
+
+def _trace_path(parent, end):
+    """Walk parent links back from end, then reverse."""
+    path = []
+    curr = end
+    while curr is not None:
+        path.append(curr)
+        curr = parent[curr]
+    path.reverse()
+    return path
+
+def _path_in_tree(tree, t):
+    """Path and cost to t in a (dist, parent) tree."""
+    dist, parent = tree
+    if t is None or dist[t] == math.inf:
+        return [], math.inf
+    return _trace_path(parent, t), dist[t]
+
+def dijkstra_tree(G, s):
+    """Full Dijkstra from id s; returns dist and parent lists indexed by id."""
+    offsets, targets, weights = G.offsets, G.targets, G.weights
+    dist = [math.inf] * G.num_nodes
+    parent = [None] * G.num_nodes
+    dist[s] = 0
+    pq = IndexedHeap()
+    pq.push_or_decrease(s, 0)
+    while pq:
+        current_dist, u = pq.pop()
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            new_dist = current_dist + weights[k]
+            if new_dist < dist[v]:
+                dist[v] = new_dist
+                parent[v] = u
+                pq.push_or_decrease(v, new_dist)
+    return dist, parent
+
+class ShortestPathTrees:
+    """LRU of (dist, parent) trees keyed by (G.version, source); None marks a negative cycle."""
+
+    _MISSING = object()
+
+    def __init__(self, max_trees: int = 8, max_sources: int = 256):
+        self.max_trees = max_trees
+        self.max_sources = max_sources
+        self._trees = OrderedDict()
+        self._sources = OrderedDict()
+        self._lock = threading.Lock()
+
+    def seen_before(self, version, s) -> bool:
+        """Record a query from s; True if s was already asked on this version."""
+        with self._lock:
+            key = (version, s)
+            if key in self._sources:
+                self._sources.move_to_end(key)
+                return True
+            self._sources[key] = True
+            while len(self._sources) > self.max_sources:
+                self._sources.popitem(last=False)
+            return False
+
+    def get(self, version, s, default=_MISSING):
+        with self._lock:
+            key = (version, s)
+            if key not in self._trees:
+                return default
+            self._trees.move_to_end(key)
+            return self._trees[key]
+
+    def put(self, version, s, tree) -> None:
+        with self._lock:
+            self._trees[(version, s)] = tree
+            self._trees.move_to_end((version, s))
+            while len(self._trees) > self.max_trees:
+                self._trees.popitem(last=False)
+
+    def invalidate(self, graph_version=None) -> None:
+        with self._lock:
+            if graph_version is None:
+                self._trees.clear()
+                self._sources.clear()
+                return
+            for key in [k for k in self._trees if k[0][0] == graph_version]:
+                del self._trees[key]
+            for key in [k for k in self._sources if k[0][0] == graph_version]:
+                del self._sources[key]
 
 class Dijkstra(IAlgorithm):
+    """Bidirectional search; a source asked again on the same G.version gets its full tree cached."""
+
+    def __init__(self, bidirectional: bool = True, max_trees: int = 8):
+        self.bidirectional = bidirectional
+        self._trees = ShortestPathTrees(max_trees)
+
     def execute(self, G, start_node, end_node):
-        dist = {node: float('inf') for node in G.nodes()}
-        dist[start_node] = 0
-        parent = {node: None for node in G.nodes()}
+        if isinstance(G, CompactGraph):
+            return self._execute_compact(G, start_node, end_node)
+
+        # Only allocate state for reached nodes
+        dist = {start_node: 0}
+        parent = {start_node: None}
         pq = [(0, start_node)]
         while pq:
             current_dist, u = heapq.heappop(pq)
@@ -17,26 +118,137 @@ class Dijkstra(IAlgorithm):
             for v, attr in G[u].items():
                 weight = attr.get('weight', 1)
                 new_dist = current_dist + weight
-                if new_dist < dist[v]:
+                if new_dist < dist.get(v, math.inf):
                     dist[v] = new_dist
                     parent[v] = u
                     heapq.heappush(pq, (new_dist, v))
         path = []
-        curr = end_node
-        if dist[end_node] != float('inf'):
-            while curr is not None:
-                path.insert(0, curr)
-                curr = parent[curr]
+        if end_node in dist:
+            path = _trace_path(parent, end_node)
         
+        return self._result(path, dist.get(end_node, math.inf))
+
+    def _execute_compact(self, G, start_node, end_node):
+        s = G.index[start_node]
+        t = G.index[end_node] if end_node is not None else None
+        cached = apsp_cache.lookup(G, s, t) if t is not None else None
+        if cached is None:
+            tree = self._source_tree(G, s)
+            if tree is not None:
+                cached = _path_in_tree(tree, t)
+        if cached is not None:
+            path, cost = cached
+        elif t is not None and self.bidirectional and not G.has_negative:
+            path, cost = self._bidirectional(G, s, t)
+        else:
+            path, cost = self._unidirectional(G, s, t)
+        names = G.names
+        return self._result([names[u] for u in path], cost)
+
+    def _source_tree(self, G, s):
+        # A full search never ends if it reaches a negative cycle
+        if G.version is None or G.has_negative:
+            return None
+        tree = self._trees.get(G.version, s, None)
+        if tree is not None:
+            return tree
+        if not self._trees.seen_before(G.version, s):
+            return None
+        tree = dijkstra_tree(G, s)
+        self._trees.put(G.version, s, tree)
+        return tree
+
+    def invalidate(self, graph_version=None) -> None:
+        self._trees.invalidate(graph_version)
+
+    def _unidirectional(self, G, s, t):
+        offsets, targets, weights = G.offsets, G.targets, G.weights
+        dist = {s: 0}
+        parent = {s: None}
+        pq = IndexedHeap()
+        pq.push_or_decrease(s, 0)
+        while pq:
+            current_dist, u = pq.pop()
+            if u == t:
+                break
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                new_dist = current_dist + weights[k]
+                if new_dist < dist.get(v, math.inf):
+                    dist[v] = new_dist
+                    parent[v] = u
+                    pq.push_or_decrease(v, new_dist)
+        if t not in dist:
+            return [], math.inf
+        return _trace_path(parent, t), dist[t]
+
+    def _bidirectional(self, G, s, t):
+        """Search from s on G and from t on the transpose; non-negative weights only."""
+        if s == t:
+            return [s], 0
+        R = G.reverse()
+        pq_f, pq_b = IndexedHeap(), IndexedHeap()
+        pq_f.push_or_decrease(s, 0)
+        pq_b.push_or_decrease(t, 0)
+        sides = (
+            (G.offsets, G.targets, G.weights, {s: 0}, {s: None}, pq_f),
+            (R.offsets, R.targets, R.weights, {t: 0}, {t: None}, pq_b),
+        )
+        best = math.inf
+        meet = None
+        while pq_f and pq_b:
+            top_f, top_b = pq_f.peek()[0], pq_b.peek()[0]
+            if top_f + top_b >= best:
+                break
+            side = 0 if top_f <= top_b else 1
+            offsets, targets, weights, dist, parent, pq = sides[side]
+            other = sides[1 - side][3]
+            current_dist, u = pq.pop()
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                new_dist = current_dist + weights[k]
+                if new_dist < dist.get(v, math.inf):
+                    dist[v] = new_dist
+                    parent[v] = u
+                    pq.push_or_decrease(v, new_dist)
+                d_other = other.get(v)
+                if d_other is not None and new_dist + d_other < best:
+                    best = new_dist + d_other
+                    meet = v
+        if meet is None:
+            return [], math.inf
+
+        path = _trace_path(sides[0][4], meet)
+        parent_b = sides[1][4]
+        curr = parent_b[meet]
+        while curr is not None:
+            path.append(curr)
+            curr = parent_b[curr]
+        return path, best
+
+    def _result(self, path, cost):
         return {
             "path_nodes": path, 
-            "cost": dist[end_node] if dist[end_node] != float('inf') else 0,
+            "cost": cost if cost != math.inf else 0,
             "type": "path", 
             "msg": "Dijkstra (Thủ công)"
         }
 
 class BellmanFord(IAlgorithm):
+    """mode: "classic", "spfa", "numpy" or "auto" (spfa). numpy needs as many rounds as the longest path, so it is opt-in."""
+
+    MODES = ("auto", "classic", "spfa", "numpy")
+
+    def __init__(self, mode: str = "auto", max_trees: int = 8):
+        if mode not in self.MODES:
+            raise ValueError(f"Chế độ Bellman-Ford không hợp lệ: {mode}")
+        self.mode = mode
+        self._trees = ShortestPathTrees(max_trees)
+
     def execute(self, G, start_node, end_node):
+        if isinstance(G, CompactGraph):
+            return self._execute_compact(G, start_node, end_node)
+
         dist = {node: float('inf') for node in G.nodes()}
         dist[start_node] = 0
         parent = {node: None for node in G.nodes()}
@@ -56,21 +268,128 @@ class BellmanFord(IAlgorithm):
                 break
         for u, v, w in edges:
             if dist[u] != float('inf') and dist[u] + w < dist[v]:
-                 return {
-                    "path_nodes": [], 
-                    "cost": 0, 
-                    "type": "path", 
-                    "msg": "Lỗi: Đồ thị có chu trình âm!"
-                }
+                 return self._negative_cycle()
         path = []
-        curr = end_node
         if dist[end_node] != float('inf'):
-            while curr is not None:
-                path.insert(0, curr)
-                curr = parent[curr]
+            path = _trace_path(parent, end_node)
+        return self._result(path, dist[end_node])
+
+    def _execute_compact(self, G, start_node, end_node):
+        s, t = G.index[start_node], G.index[end_node]
+        tree = self._trees.get(G.version, s) if G.version is not None else ShortestPathTrees._MISSING
+        if tree is ShortestPathTrees._MISSING:
+            tree = self._relax(G, s)
+            # Keep the full tree for later targets
+            if G.version is not None:
+                self._trees.put(G.version, s, tree)
+        if tree is None:
+            return self._negative_cycle()
+        path, cost = _path_in_tree(tree, t)
+        return self._result([G.names[u] for u in path], cost)
+
+    def _relax(self, G, s):
+        mode = self.mode
+        if mode == "numpy":
+            return self._relax_numpy(G, s)
+        if mode == "classic":
+            return self._relax_classic(G, s)
+        return self._relax_spfa(G, s)
+
+    def invalidate(self, graph_version=None) -> None:
+        self._trees.invalidate(graph_version)
+
+    def _relax_classic(self, G, s):
+        n = G.num_nodes
+        inf = math.inf
+        dist = [inf] * n
+        parent = [None] * n
+        dist[s] = 0
+        # Undirected edges are relaxed both ways
+        edges = list(G.arcs())
+        for _ in range(n - 1):
+            changed = False
+            for u, v, w in edges:
+                du = dist[u]
+                if du != inf and du + w < dist[v]:
+                    dist[v] = du + w
+                    parent[v] = u
+                    changed = True
+            if not changed:
+                break
+        for u, v, w in edges:
+            if dist[u] != inf and dist[u] + w < dist[v]:
+                return None
+        return dist, parent
+
+    def _relax_spfa(self, G, s):
+        # A path of |V| or more edges means a negative cycle
+        offsets, targets, weights = G.offsets, G.targets, G.weights
+        n = G.num_nodes
+        inf = math.inf
+        dist = [inf] * n
+        parent = [None] * n
+        hops = [0] * n
+        in_queue = bytearray(n)
+        dist[s] = 0
+        queue = deque([s])
+        in_queue[s] = 1
+        while queue:
+            u = queue.popleft()
+            in_queue[u] = 0
+            du = dist[u]
+            hu = hops[u] + 1
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                new_dist = du + weights[k]
+                if new_dist < dist[v]:
+                    if hu >= n:
+                        return None
+                    dist[v] = new_dist
+                    parent[v] = u
+                    hops[v] = hu
+                    if not in_queue[v]:
+                        in_queue[v] = 1
+                        queue.append(v)
+        return dist, parent
+
+    def _relax_numpy(self, G, s):
+        # parent only changes on a strict improvement, so it stays acyclic
+        src, dst, w = G.arc_arrays()
+        n = G.num_nodes
+        dist = np.full(n, np.inf)
+        dist[s] = 0
+        parent = np.full(n, -1, dtype=np.int64)
+        for _ in range(max(n - 1, 0)):
+            cand = dist[src] + w
+            new_dist = dist.copy()
+            np.minimum.at(new_dist, dst, cand)
+            improved = new_dist < dist
+            if not improved.any():
+                break
+            tight = improved[dst] & (cand == new_dist[dst])
+            parent[dst[tight]] = src[tight]
+            dist = new_dist
+        else:
+            if n > 0 and (dist[src] + w < dist[dst]).any():
+                return None
+
+        as_int = G.weights.typecode != 'd'
+        dist_list = [(int(d) if as_int else float(d)) if d != np.inf else math.inf for d in dist.tolist()]
+        parent_list = [p if p >= 0 else None for p in parent.tolist()]
+        return dist_list, parent_list
+
+    def _negative_cycle(self):
+        return {
+            "path_nodes": [], 
+            "cost": 0, 
+            "type": "path", 
+            "msg": "Lỗi: Đồ thị có chu trình âm!"
+        }
+
+    def _result(self, path, cost):
         return {
             "path_nodes": path, 
-            "cost": dist[end_node] if dist[end_node] != float('inf') else 0,
+            "cost": cost if cost != float('inf') else 0,
             "type": "path", 
             "msg": "Bellman-Ford (Thủ công)"
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,116 @@
+from array import array
+
+
+class DisjointSet:
+    """Array-backed union-find over ids 0..n-1."""
+
+    __slots__ = ("parent", "size", "components")
+
+    def __init__(self, n: int):
+        self.parent = array('i' if n < 2 ** 31 else 'q', range(n))
+        self.size = array('i' if n < 2 ** 31 else 'q', [1]) * n
+        self.components = n
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> bool:
+        root_i = self.find(i)
+        root_j = self.find(j)
+        if root_i == root_j:
+            return False
+        size = self.size
+        if size[root_i] < size[root_j]:
+            root_i, root_j = root_j, root_i
+        self.parent[root_j] = root_i
+        size[root_i] += size[root_j]
+        self.components -= 1
+        return True
+
+
+class IndexedHeap:
+    """Binary min-heap of (key, id) with decrease-key."""
+
+    __slots__ = ("_heap", "_pos")
+
+    def __init__(self):
+        self._heap = []
+        self._pos = {}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __bool__(self) -> bool:
+        return bool(self._heap)
+
+    def __contains__(self, node: int) -> bool:
+        return node in self._pos
+
+    def get(self, node: int, default=None):
+        i = self._pos.get(node)
+        return default if i is None else self._heap[i][0]
+
+    def peek(self):
+        return self._heap[0]
+
+    def push_or_decrease(self, node: int, key) -> bool:
+        """Returns False if key is not smaller than the current one."""
+        i = self._pos.get(node)
+        if i is None:
+            self._heap.append((key, node))
+            self._sift_up(len(self._heap) - 1)
+            return True
+        if key < self._heap[i][0]:
+            self._heap[i] = (key, node)
+            self._sift_up(i)
+            return True
+        return False
+
+    def pop(self):
+        heap = self._heap
+        top = heap[0]
+        last = heap.pop()
+        del self._pos[top[1]]
+        if heap:
+            heap[0] = last
+            self._sift_down(0)
+        return top
+
+    def _sift_up(self, i: int) -> None:
+        heap, pos = self._heap, self._pos
+        item = heap[i]
+        while i > 0:
+            p = (i - 1) >> 1
+            parent = heap[p]
+            if item < parent:
+                heap[i] = parent
+                pos[parent[1]] = i
+                i = p
+            else:
+                break
+        heap[i] = item
+        pos[item[1]] = i
+
+    def _sift_down(self, i: int) -> None:
+        heap, pos = self._heap, self._pos
+        size = len(heap)
+        item = heap[i]
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            right = child + 1
+            if right < size and heap[right] < heap[child]:
+                child = right
+            if heap[child] < item:
+                heap[i] = heap[child]
+                pos[heap[i][1]] = i
+                i = child
+            else:
+                break
+        heap[i] = item
+        pos[item[1]] = i
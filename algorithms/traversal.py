@@ -1,9 +1,110 @@
 from .base import IAlgorithm
+from .graph import CompactGraph
 import networkx as nx
+import numpy as np
 from collections import deque
 
+def bfs_order(G, s, alpha=14, beta=24, min_switch_arcs=10_000):
+    """Direction-optimizing BFS over CompactGraph ids (alpha/beta switch thresholds)."""
+    offsets, targets = G.offsets, G.targets
+    n = G.num_nodes
+    total_arcs = len(targets)
+    visited = bytearray(n)
+    visited[s] = 1
+    order = [s]
+    frontier = [s]
+    visited_arcs = offsets[s + 1] - offsets[s]
+    bottom_up = False
+    while frontier:
+        if total_arcs >= min_switch_arcs:
+            frontier_arcs = sum(offsets[u + 1] - offsets[u] for u in frontier)
+            if not bottom_up and frontier_arcs > (total_arcs - visited_arcs) / alpha:
+                bottom_up = True
+            elif bottom_up and len(frontier) < n / beta:
+                bottom_up = False
+
+        if bottom_up:
+            next_frontier = _bottom_up_step(G, G.reverse(), visited, frontier)
+        else:
+            next_frontier = []
+            for u in frontier:
+                for k in range(offsets[u], offsets[u + 1]):
+                    v = targets[k]
+                    if not visited[v]:
+                        visited[v] = 1
+                        next_frontier.append(v)
+
+        for v in next_frontier:
+            visited_arcs += offsets[v + 1] - offsets[v]
+        order.extend(next_frontier)
+        frontier = next_frontier
+    return order
+
+def _bottom_up_step(G, R, visited, frontier):
+    # Each unvisited vertex scans its in-arcs in R and stops at the first frontier parent
+    offsets, targets = R.offsets, R.targets
+    in_frontier = bytearray(len(visited))
+    for u in frontier:
+        in_frontier[u] = 1
+    children = []
+    for v in np.flatnonzero(np.frombuffer(visited, dtype=np.uint8) == 0).tolist():
+        for k in range(offsets[v], offsets[v + 1]):
+            if in_frontier[targets[k]]:
+                children.append(v)
+                break
+    if not children:
+        return []
+    return _top_down_order(G, R, visited, frontier, children)
+
+def _top_down_order(G, R, visited, frontier, children):
+    # Emit the level as top-down would: by (parent's frontier rank, arc index)
+    rank = [-1] * len(visited)
+    for i, u in enumerate(frontier):
+        rank[u] = i
+    r_offsets, r_targets = R.offsets, R.targets
+    by_parent = {}
+    for v in children:
+        best = min(rank[u] for u in r_targets[r_offsets[v]:r_offsets[v + 1]] if rank[u] >= 0)
+        by_parent.setdefault(best, []).append(v)
+
+    offsets, targets = G.offsets, G.targets
+    next_frontier = []
+    for best in sorted(by_parent):
+        kids = by_parent[best]
+        if len(kids) == 1:
+            visited[kids[0]] = 1
+            next_frontier.append(kids[0])
+            continue
+        u = frontier[best]
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            if not visited[v]:
+                visited[v] = 1
+                next_frontier.append(v)
+    return next_frontier
+
+def dfs_order(G, s):
+    # Push neighbors in reverse CSR order instead of copying the adjacency list
+    offsets, targets = G.offsets, G.targets
+    visited = bytearray(G.num_nodes)
+    stack = [s]
+    order = []
+    while stack:
+        u = stack.pop()
+        if not visited[u]:
+            visited[u] = 1
+            order.append(u)
+            for k in range(offsets[u + 1] - 1, offsets[u] - 1, -1):
+                v = targets[k]
+                if not visited[v]:
+                    stack.append(v)
+    return order
+
 class BFS(IAlgorithm):
     def execute(self, G, start_node, end_node=None):
+        if isinstance(G, CompactGraph):
+            return self._result(self._execute_compact(G, start_node))
+
         visited = set()
         queue = deque([start_node])
         path = []  
@@ -18,6 +119,13 @@ class BFS(IAlgorithm):
                     visited.add(v)
                     queue.append(v)
                     
+        return self._result(path)
+
+    def _execute_compact(self, G, start_node):
+        names = G.names
+        return [names[u] for u in bfs_order(G, G.index[start_node])]
+
+    def _result(self, path):
         return {
             "path_nodes": path, 
             "type": "traversal", 
@@ -26,6 +134,9 @@ class BFS(IAlgorithm):
 
 class DFS(IAlgorithm):
     def execute(self, G, start_node, end_node=None):
+        if isinstance(G, CompactGraph):
+            return self._result(self._execute_compact(G, start_node))
+
         visited = set()
         stack = [start_node]
         path = []
@@ -39,8 +150,15 @@ class DFS(IAlgorithm):
                 for v in reversed(neighbors):
                     if v not in visited:
                         stack.append(v)
+        return self._result(path)
+
+    def _execute_compact(self, G, start_node):
+        names = G.names
+        return [names[u] for u in dfs_order(G, G.index[start_node])]
+
+    def _result(self, path):
         return {
             "path_nodes": path, 
             "type": "traversal", 
             "msg": f"DFS duyệt {len(path)} đỉnh (Thủ công)"
-        }
\ No newline at end of file
+        }
@@ -1,5 +1,6 @@
 import json
 import os
+import time
 import streamlit as st
 import streamlit.components.v1 as components
 
@@ -8,6 +9,7 @@ from ui.visualization import Visualizer
 from ui.components import Components
 from services.graph_service import GraphService
 from services.algorithm_service import AlgorithmFactory
+from services.edge_store import EdgeStore
 
 st.set_page_config(
     layout="wide", 
@@ -66,9 +68,20 @@ def load_graph_from_data(data):
     """Core logic to load graph from JSON and persist it."""
     try:
         valid_nodes, valid_edges, valid_config = st.session_state.graph_service.from_json(data)
-        
-        st.session_state.nodes = valid_nodes
-        st.session_state.edges = valid_edges
+        frame = st.session_state.graph_service.normalize(valid_nodes, valid_edges)
+    except Exception as e:
+        st.error(f"Lỗi xử lý dữ liệu: {e}")
+        return
+    apply_loaded_graph(frame, valid_config)
+
+def apply_loaded_graph(frame, valid_config):
+    """Replaces the in-memory graph with a normalized frame and overwrites the DB with it."""
+    try:
+        # The same frame feeds the DB write and the graph build
+        if frame.report:
+            st.warning(f"Dữ liệu nhập đã được chuẩn hóa: {frame.report.message()}")
+        st.session_state.nodes = frame.node_list()
+        st.session_state.edges = EdgeStore(frame.edge_records())
         
         new_type = "Có hướng" if valid_config.get('is_directed', True) else "Vô hướng"
         new_weighted = valid_config.get('is_weighted', True)
@@ -76,13 +89,21 @@ def load_graph_from_data(data):
         st.session_state.cfg_graph_type = new_type
         st.session_state.cfg_is_weighted = new_weighted
         
+        bar = st.progress(0.0, text="Đang lưu vào Memgraph...")
+
+        def report(done, total, stage):
+            bar.progress(done / total if total else 1.0, text=f"{stage}: {done}/{total}")
+
         success, msg = st.session_state.graph_service.sync_to_db(
-            valid_nodes,
-            valid_edges,
+            st.session_state.nodes,
+            st.session_state.edges,
             is_directed=(new_type == "Có hướng"),
             is_weighted=new_weighted,
-            force=True 
+            force=True,
+            progress=report,
+            frame=frame
         )
+        bar.empty()
         
         if success:
             st.session_state.dirty = False
@@ -95,12 +116,39 @@ def load_graph_from_data(data):
 
 def on_import_click():
     """Callback for File Import Button"""
-    if st.session_state.get("u_file") is not None:
+    u_file = st.session_state.get("u_file")
+    if u_file is not None:
         try:
-            data = json.load(st.session_state.u_file)
-            load_graph_from_data(data)
+            # Stream the file line by line
+            nodes, edges, config = st.session_state.graph_service.from_file(u_file, u_file.name)
+            frame = st.session_state.graph_service.normalize(nodes, edges)
         except Exception as e:
-            st.error(f"Lỗi đọc file JSON: {e}")
+            st.error(f"Lỗi đọc file: {e}")
+            return
+        # Free the raw rows before writing to the DB
+        del nodes, edges
+        # CSV has no config: keep the current one
+        config = {
+            "is_directed": st.session_state.cfg_graph_type == "Có hướng",
+            "is_weighted": st.session_state.cfg_is_weighted,
+            **config,
+        }
+        apply_loaded_graph(frame, config)
+
+def on_export_click(fmt, compression, config):
+    """Callback for Export Button: builds the export only when requested."""
+    service = st.session_state.graph_service
+    st.session_state.export_file = None
+    try:
+        data = service.export_bytes(st.session_state.nodes, st.session_state.edges, config, fmt, compression)
+    except Exception as e:
+        st.error(f"Lỗi xuất dữ liệu: {e}")
+        return
+    st.session_state.export_file = {
+        "data": data,
+        "key": (service.graph_version, fmt, compression, config["is_directed"], config["is_weighted"]),
+        "name": f"graph_data.{fmt}" + (f".{compression}" if compression else ""),
+    }
 
 def on_sample_click():
     """Callback for Sample Load Button"""
@@ -122,9 +170,16 @@ def on_sample_click():
 
 if not st.session_state.data_loaded:
     try:
-        db_nodes, db_edges, db_config = st.session_state.graph_service.load_from_db()
+        service = st.session_state.graph_service
+        if service.should_load_partial():
+            # Too large to load fully: load a neighborhood on demand
+            db_nodes, db_edges, db_config = [], [], service.start_partial()
+            st.session_state.partial_mode = True
+        else:
+            db_nodes, db_edges, db_config = service.load_from_db()
+            st.session_state.partial_mode = False
         st.session_state.nodes = db_nodes if db_nodes else []
-        st.session_state.edges = db_edges if db_edges else []
+        st.session_state.edges = EdgeStore(db_edges or [])
         
         if db_config:
             st.session_state.cfg_graph_type = "Có hướng" if db_config.get('is_directed', True) else "Vô hướng"
@@ -147,6 +202,28 @@ st.title("Chương Trình Mô Phỏng Đồ Thị Dựa Trên Memgraph")
 with st.sidebar:
     st.markdown("## 🎛️ Bảng Điều Khiển")
 
+    if st.session_state.get("partial_mode"):
+        with st.expander("🔭 Vùng Lân Cận", expanded=True):
+            service = st.session_state.graph_service
+            st.caption(f"DB có {service.db_size} đỉnh + cạnh, chỉ tải vùng quanh một đỉnh.")
+            nb_center = st.text_input("Đỉnh trung tâm", key="nb_center")
+            nb_hops = st.number_input("Số bước (k)", min_value=1, max_value=10, value=2, key="nb_hops")
+            n1, n2 = st.columns(2)
+            if n1.button("Tải vùng", use_container_width=True) and nb_center:
+                try:
+                    nb_nodes, nb_edges = service.load_neighborhood(nb_center.strip(), int(nb_hops))
+                    st.session_state.nodes, st.session_state.edges = nb_nodes, EdgeStore(nb_edges)
+                    st.session_state.algo_result = {}
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Lỗi tải vùng: {e}")
+            if n2.button("Tải thêm", use_container_width=True, disabled=not service.neighborhood_has_more):
+                new_nodes, new_edges = service.expand_neighborhood()
+                st.session_state.nodes = st.session_state.nodes + new_nodes
+                st.session_state.edges.extend(new_edges)
+                st.rerun()
+            st.caption(f"Đã tải {len(st.session_state.nodes)} đỉnh, {len(st.session_state.edges)} cạnh.")
+
     with st.expander("⚙️ Cấu Hình Đồ Thị", expanded=True):
         c_type, c_weight = st.columns(2)
         graph_type = c_type.radio(
@@ -168,10 +245,10 @@ with st.sidebar:
     st.write("")
 
     with st.expander("🧮 Chọn Thuật Toán", expanded=True):
-        algos = ["BFS", "DFS", "Dijkstra", "Bellman-Ford", "Prim", "Kruskal"]
+        algos = ["BFS", "DFS", "Dijkstra", "Bellman-Ford", "A*", "APSP", "Prim", "Kruskal", "Borůvka"]
         algo_name = st.selectbox("Thuật toán", algos, label_visibility="collapsed")
         
-        need_end = algo_name not in ["BFS", "DFS", "Prim", "Kruskal"]
+        need_end = algo_name not in ["BFS", "DFS", "Prim", "Kruskal", "Borůvka"]
         
         c1 = st.container()
         start = c1.selectbox("Bắt đầu", st.session_state.nodes) if st.session_state.nodes else None
@@ -187,14 +264,22 @@ with st.sidebar:
                 st.error("Đồ thị trống!")
             else:
                 try:
-                    G = st.session_state.graph_service.build_networkx_graph(
-                        st.session_state.nodes, 
-                        st.session_state.edges,
-                        is_directed=is_directed,
-                        is_weighted=is_weighted
+                    service = st.session_state.graph_service
+                    partial = st.session_state.get("partial_mode", False) and service.partial
+                    # Partial mode: traversals read adjacency from the DB
+                    lazy = partial and algo_name in ("BFS", "DFS", "Dijkstra")
+                    res = AlgorithmFactory.run(
+                        algo_name, service.graph_key, start, end, is_directed, is_weighted,
+                        (lambda: service.lazy_graph(is_directed, is_weighted)) if lazy else
+                        (lambda: service.build_compact_graph(
+                            st.session_state.nodes, 
+                            st.session_state.edges,
+                            is_directed=is_directed,
+                            is_weighted=is_weighted
+                        )),
+                        graph_size=service.db_size if partial else len(st.session_state.nodes) + len(st.session_state.edges),
+                        db_in_sync=lazy if partial else service.db_in_sync(is_directed)
                     )
-                    algorithm = AlgorithmFactory.get_algorithm(algo_name)
-                    res = algorithm.execute(G, start, end)
                     
                     st.session_state.algo_result = res
                     st.session_state.algo_result['algo_name'] = algo_name
@@ -213,16 +298,26 @@ with st.sidebar:
             
         if b2.button("XÓA ĐỒ THỊ", use_container_width=True):
             st.session_state.nodes = []
-            st.session_state.edges = []
+            st.session_state.edges = EdgeStore()
+            st.session_state.graph_service.mark_full_sync()
             st.session_state.dirty = True
             sync_data_callback() 
             st.session_state.algo_result = {}
             st.rerun()
             
+        if st.button("KIỂM TRA DB", use_container_width=True):
+            try:
+                ok, msg = st.session_state.graph_service.check_consistency(
+                    st.session_state.nodes, st.session_state.edges, is_directed=is_directed, deep=True
+                )
+                (st.success if ok else st.warning)(msg)
+            except Exception as e:
+                st.error(f"Lỗi kiểm tra: {e}")
+
         if st.button("RESET DATABASE", use_container_width=True):
             st.session_state.graph_service.clear_db()
             st.session_state.nodes = []
-            st.session_state.edges = []
+            st.session_state.edges = EdgeStore()
             st.session_state.dirty = False
             st.rerun()
 
@@ -235,24 +330,31 @@ with st.sidebar:
                 "is_directed": is_directed,
                 "is_weighted": is_weighted
             }
-            json_data = st.session_state.graph_service.to_json(
-                st.session_state.nodes, 
-                st.session_state.edges, 
-                export_config
-            )
-            st.download_button(
-                label="💾 Tải xuống JSON",
-                data=json.dumps(json_data, indent=2, ensure_ascii=False),
-                file_name="graph_data.json",
-                mime="application/json"
-            )
+            e1, e2 = st.columns(2)
+            exp_fmt = e1.selectbox("Định dạng", ["ndjson", "csv", "json"], key="exp_fmt")
+            exp_comp = e2.selectbox("Nén", ["gz", "zst", ""], format_func=lambda c: c or "không", key="exp_comp")
+            st.button("Chuẩn bị file xuất", on_click=on_export_click, args=(exp_fmt, exp_comp, export_config))
+
+            # Only offer an export built for the current graph and options; drop stale ones
+            export_file = st.session_state.get("export_file")
+            export_key = (st.session_state.graph_service.graph_version, exp_fmt, exp_comp, is_directed, is_weighted)
+            if export_file and export_file["key"] == export_key:
+                st.download_button(
+                    label="💾 Tải xuống",
+                    data=export_file["data"],
+                    file_name=export_file["name"],
+                    mime="application/octet-stream"
+                )
+            elif export_file:
+                st.session_state.export_file = None
         else:
             st.caption("Đồ thị trống.")
 
         st.markdown("---")
         
         st.markdown("**2. Nhập Dữ Liệu**")
-        st.file_uploader("Chọn file JSON", type=["json"], key="u_file")
+        st.file_uploader("Chọn file (JSON, NDJSON, CSV; có thể nén .gz/.zst)",
+                         type=["json", "ndjson", "jsonl", "csv", "gz", "zst"], key="u_file")
         st.button("Lên tải & Áp dụng", on_click=on_import_click)
 
         st.markdown("---")
@@ -265,6 +367,10 @@ with st.sidebar:
         st.selectbox("Chọn mẫu", sample_keys, key="sel_sample")
         st.button("Tải Mẫu", on_click=on_sample_click, type="secondary")
 
+        snap = st.session_state.graph_service.snapshot_status()
+        last_snap = time.strftime("%H:%M:%S", time.localtime(snap["last_snapshot"])) if snap["last_snapshot"] else "chưa có"
+        st.caption(f"📸 Snapshot gần nhất: {last_snap} · Thay đổi chờ snapshot: {snap['pending_changes']}")
+
 res = st.session_state.algo_result
     
 if st.session_state.nodes:
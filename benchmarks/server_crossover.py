@@ -0,0 +1,100 @@
+"""Python vs in-Memgraph crossover, used to pick SERVER_ALGO_THRESHOLD.
+Overwrites all data in Memgraph.
+
+    docker-compose run --rm app python benchmarks/server_crossover.py --yes
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from algorithms.graph import CompactGraph  # noqa: E402
+from services.algorithm_service import AlgorithmFactory  # noqa: E402
+from services.graph_service import GraphService  # noqa: E402
+from services.server_backend import MemgraphBackend  # noqa: E402
+
+
+def random_graph(n, degree, seed):
+    rng = random.Random(seed)
+    nodes = [str(i) for i in range(n)]
+    # A 0-1-...-(n-1) chain keeps the graph connected
+    edges = [{"source": str(i), "target": str(i + 1), "weight": rng.randint(1, 100)} for i in range(n - 1)]
+    edges += [{"source": str(rng.randrange(n)), "target": str(rng.randrange(n)), "weight": rng.randint(1, 100)}
+              for _ in range(max(0, n * degree - (n - 1)))]
+    return nodes, edges
+
+
+def median_time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,50000,100000,300000", help="số đỉnh, phân tách bằng dấu phẩy")
+    parser.add_argument("--degree", type=int, default=4, help="số cạnh trung bình trên mỗi đỉnh")
+    parser.add_argument("--algos", default="BFS,Dijkstra,Kruskal,Prim")
+    parser.add_argument("--undirected", action="store_true")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--yes", action="store_true", help="xác nhận cho phép xóa dữ liệu trong Memgraph")
+    args = parser.parse_args()
+
+    if not args.yes:
+        parser.error("benchmark ghi đè toàn bộ dữ liệu trong Memgraph; chạy lại với --yes để xác nhận")
+
+    is_directed = not args.undirected
+    service = GraphService()
+    if not service.repository.is_connected:
+        sys.exit("Không kết nối được Memgraph")
+    backend = MemgraphBackend(threshold=1, repository=service.repository)
+    algos = [a for a in args.algos.split(",") if a]
+
+    rows = []
+    for n in (int(x) for x in args.sizes.split(",")):
+        nodes, edges = random_graph(n, args.degree, args.seed)
+        ok, msg = service.sync_to_db(nodes, edges, is_directed=is_directed, is_weighted=True, force=True)
+        if not ok:
+            sys.exit(f"Ghi dữ liệu thất bại: {msg}")
+        size = len(nodes) + len(edges)
+        start, end = nodes[0], nodes[-1]
+
+        for name in algos:
+            if not backend.accepts(name, size, is_directed):
+                continue
+            # Fresh instance so cached trees do not skew timings
+            algo_cls = type(AlgorithmFactory.get_algorithm(name))
+
+            def run_python():
+                # Build directly, bypassing the GraphService cache
+                G = CompactGraph.from_lists(nodes, edges, is_directed=is_directed, is_weighted=True)
+                algo_cls().execute(G, start, end)
+
+            def run_server():
+                if backend.execute(name, start, end, is_directed, True) is None:
+                    raise RuntimeError(f"{name} không chạy được trên server (xem log)")
+
+            t_py = median_time(run_python, args.repeat)
+            t_srv = median_time(run_server, args.repeat)
+            rows.append((name, n, size, t_py, t_srv))
+            print(f"{name:<9} n={n:<8} rows={size:<9} python={t_py * 1000:9.1f} ms  server={t_srv * 1000:9.1f} ms", flush=True)
+
+    print()
+    for name in algos:
+        faster = [size for algo, _, size, t_py, t_srv in rows if algo == name and t_srv < t_py]
+        if faster:
+            print(f"{name}: server nhanh hơn từ {min(faster)} dòng (đỉnh + cạnh)")
+        else:
+            print(f"{name}: server không nhanh hơn ở các kích thước đã đo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Memgraph query module: minimum spanning forest (Kruskal) over :Node/:LINK, edges treated as undirected."""
+import mgp
+
+
+def _find(parent, x):
+    while parent[x] != x:
+        parent[x] = parent[parent[x]]
+        x = parent[x]
+    return x
+
+
+@mgp.read_proc
+def kruskal(
+    ctx: mgp.ProcCtx,
+    start: mgp.Nullable[str] = None,
+    weighted: bool = True,
+) -> mgp.Record(source=str, target=str, weight=mgp.Number):
+    names = []
+    ids = {}
+    edges = []
+    for vertex in ctx.graph.vertices:
+        if not any(label.name == "Node" for label in vertex.labels):
+            continue
+        ids[vertex.id] = len(names)
+        names.append(str(vertex.properties.get("name")))
+
+    for vertex in ctx.graph.vertices:
+        u = ids.get(vertex.id)
+        if u is None:
+            continue
+        for edge in vertex.out_edges:
+            if edge.type.name != "LINK":
+                continue
+            v = ids.get(edge.to_vertex.id)
+            if v is None:
+                continue
+            w = edge.properties.get("weight", 1) if weighted else 1
+            edges.append((w if w is not None else 1, len(edges), u, v))
+
+    ctx.check_must_abort()
+    edges.sort()
+    parent = list(range(len(names)))
+    tree = []
+    for w, _, u, v in edges:
+        ru, rv = _find(parent, u), _find(parent, v)
+        if ru != rv:
+            parent[ru] = rv
+            tree.append((u, v, w))
+            if len(tree) == len(names) - 1:
+                break
+
+    if start is not None:
+        s = names.index(start) if start in names else None
+        if s is None:
+            return []
+        root = _find(parent, s)
+        tree = [e for e in tree if _find(parent, e[0]) == root]
+
+    return [mgp.Record(source=names[u], target=names[v], weight=w) for u, v, w in tree]
@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Dict, List, Optional, Tuple, TypeVar
+
+from neo4j import AsyncGraphDatabase, AsyncDriver
+
+from repositories.graph_repository import (
+    GraphColumns, GraphRepository, _Q_CLEAR_DATABASE, _Q_CLEAR_GRAPH, _Q_CREATE_EDGES, _Q_CREATE_INDEX,
+    _Q_DELETE_EDGES, _Q_DELETE_NODES, _Q_LOAD_CONFIG, _Q_LOAD_GRAPH, _Q_MERGE_NODES, _Q_UPSERT_EDGES,
+    _add_counters, _clean_edge_rows, _config_query, _driver_settings, _env_int, _prepare_rows, _write_counters,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncGraphRepository:
+    """asyncio GraphRepository; the driver lives on a private event loop thread."""
+
+    _instance = None
+    _lock = threading.Lock()
+    driver: Optional[AsyncDriver] = None
+
+    def __new__(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super(AsyncGraphRepository, cls).__new__(cls)
+                cls._instance._initialize()
+        return cls._instance
+
+    def _initialize(self) -> None:
+        self.driver = None
+        self.uri, self.pool_config = _driver_settings()
+        self.snapshots = GraphRepository().snapshots
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="memgraph-async", daemon=True)
+        self._thread.start()
+
+    async def _call(self, coro: Awaitable[T]) -> T:
+        # Run on the repository loop, where the driver lives
+        if asyncio.get_running_loop() is self._loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop))
+
+    def _get_driver(self) -> AsyncDriver:
+        if self.driver is None:
+            self.driver = AsyncGraphDatabase.driver(self.uri, auth=("", ""), **self.pool_config)
+        return self.driver
+
+    async def close(self) -> None:
+        async def _close():
+            if self.driver:
+                await self.driver.close()
+                self.driver = None
+        await self._call(_close())
+
+    async def is_connected(self) -> bool:
+        async def _verify():
+            try:
+                await self._get_driver().verify_connectivity()
+                return True
+            except Exception:
+                return False
+        return await self._call(_verify())
+
+    async def execute_query(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        async def _run():
+            async with self._get_driver().session() as session:
+                result = await session.run(query, params or {})
+                return [record.data() async for record in result]
+        return await self._call(_run())
+
+    async def get_all_nodes_and_edges(self) -> Tuple[List[str], List[Dict[str, Any]], Dict[str, Any]]:
+        columns = await self.load_columns()
+        return list(columns.names), columns.edge_rows(), columns.config
+
+    async def load_columns(self, fetch_size: Optional[int] = None) -> GraphColumns:
+        # Graph and config queries run concurrently
+        fetch_size = fetch_size or _env_int("LOAD_FETCH_SIZE", 10_000)
+
+        async def read_graph(columns: GraphColumns) -> None:
+            async with self._get_driver().session(fetch_size=fetch_size) as session:
+                result = await session.run(_Q_LOAD_GRAPH)
+                async for s, t, w in result:
+                    columns.add_row(s, t, w)
+
+        async def read_config(columns: GraphColumns) -> None:
+            try:
+                async with self._get_driver().session() as session:
+                    result = await session.run(_Q_LOAD_CONFIG)
+                    columns.set_config(await result.single())
+            except Exception as e:
+                logger.warning(f"Could not load config: {e}")
+
+        async def _load():
+            columns = GraphColumns.empty()
+            await asyncio.gather(read_graph(columns), read_config(columns))
+            return columns
+
+        columns = await self._call(_load())
+        logger.info(f"📥 Loaded {columns.num_nodes} nodes, {columns.num_edges} edges.")
+        return columns
+
+    async def sync_graph(self, nodes: List[str], edges: List[Dict[str, Any]], prepared: bool = False) -> Tuple[bool, str]:
+        node_data, edge_data = _prepare_rows(nodes, edges, prepared)
+
+        async def _write():
+            counters = _write_counters()
+            async with self._get_driver().session() as session:
+                try:
+                    await (await session.run(_Q_CREATE_INDEX)).consume()
+                except Exception:
+                    pass
+                async with await session.begin_transaction() as tx:
+                    _add_counters(counters, await (await tx.run(_Q_CLEAR_GRAPH)).consume())
+                    if node_data:
+                        _add_counters(counters, await (await tx.run(_Q_MERGE_NODES, {"batch": node_data})).consume())
+                    if edge_data:
+                        _add_counters(counters, await (await tx.run(_Q_CREATE_EDGES, {"batch": edge_data})).consume())
+                    await tx.commit()
+            return counters
+
+        try:
+            counters = await self._call(_write())
+        except Exception as e:
+            logger.error(f"Sync Error: {e}")
+            return False, str(e)
+
+        self.snapshots.record(len(nodes) + len(edges))
+        created = counters["relationships_created"]
+        if edges:
+            if created == 0:
+                return False, "Sync failed: Database reported 0 edges created."
+            if created < len(edge_data):
+                logger.warning(f"Only {created}/{len(edge_data)} edges were created (missing endpoints?)")
+            verify_msg = f"(Verified: {created}/{len(edge_data)} edges created)"
+        else:
+            verify_msg = "(Empty Graph)"
+        msg = f"Saved {len(nodes)} nodes, {len(edges)} edges. {verify_msg}"
+        logger.info(f"✅ {msg}")
+        return True, msg
+
+    async def apply_changes(self, added_nodes: List[str], removed_nodes: List[str], upserted_edges: List[Dict[str, Any]], removed_edges: List[Dict[str, Any]]) -> Tuple[bool, str]:
+        edge_del = _clean_edge_rows(removed_edges, False)
+        edge_up = _clean_edge_rows(upserted_edges, True)
+
+        async def _write():
+            counters = _write_counters()
+            async with self._get_driver().session() as session:
+                async with await session.begin_transaction() as tx:
+                    if edge_del:
+                        _add_counters(counters, await (await tx.run(_Q_DELETE_EDGES, {"batch": edge_del})).consume())
+                    if removed_nodes:
+                        _add_counters(counters, await (await tx.run(_Q_DELETE_NODES,
+                                                                         {"batch": [str(n).strip() for n in removed_nodes]})).consume())
+                    if added_nodes:
+                        _add_counters(counters, await (await tx.run(_Q_MERGE_NODES,
+                                                                         {"batch": [str(n).strip() for n in added_nodes]})).consume())
+                    if edge_up:
+                        _add_counters(counters, await (await tx.run(_Q_UPSERT_EDGES, {"batch": edge_up})).consume())
+                    await tx.commit()
+            return counters
+
+        try:
+            counters = await self._call(_write())
+        except Exception as e:
+            logger.error(f"Sync Error: {e}")
+            return False, str(e)
+
+        self.snapshots.record(len(added_nodes) + len(removed_nodes) + len(edge_up) + len(edge_del))
+        if counters["properties_set"] < len(edge_up):
+            logger.warning(f"Only {counters['properties_set']}/{len(edge_up)} edge upserts matched both endpoints")
+        msg = (f"Synced changes: +{len(added_nodes)}/-{len(removed_nodes)} nodes, "
+               f"+{len(edge_up)}/-{len(edge_del)} edges. "
+               f"(Verified: +{counters['nodes_created']}/-{counters['nodes_deleted']} nodes, "
+               f"+{counters['relationships_created']}/-{counters['relationships_deleted']} edges)")
+        logger.info(f"✅ {msg}")
+        return True, msg
+
+    async def save_config(self, is_directed: bool, is_weighted: bool, edge_storage: Optional[str] = None) -> None:
+        try:
+            await self.execute_query(_config_query(edge_storage), {"d": is_directed, "w": is_weighted, "s": edge_storage})
+        except Exception as e:
+            logger.error(f"Save Config Error: {e}")
+
+    async def clear_database(self) -> None:
+        try:
+            await self.execute_query(_Q_CLEAR_DATABASE)
+            self.snapshots.record(1)
+            logger.warning("Database Wiped.")
+        except Exception as e:
+            logger.error(f"Clear DB Error: {e}")
+
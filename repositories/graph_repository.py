@@ -1,12 +1,206 @@
 import os
+import csv
+import time
+import hashlib
+import uuid
 import logging
-from typing import List, Tuple, Dict, Any, Optional
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Tuple, Dict, Any, Optional, Callable
 from neo4j import GraphDatabase, Driver
+from neo4j.exceptions import ServiceUnavailable, SessionExpired
+from repositories.snapshot_scheduler import SnapshotScheduler
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+ProgressCallback = Callable[[int, int, str], None]
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+def _driver_settings() -> Tuple[str, Dict[str, Any]]:
+    host = os.getenv("MEMGRAPH_HOST", "memgraph-db")
+    port = os.getenv("MEMGRAPH_PORT", "7687")
+    pool_config = {
+        "max_connection_pool_size": _env_int("MEMGRAPH_MAX_POOL_SIZE", 100),
+        "connection_acquisition_timeout": _env_float("MEMGRAPH_ACQUISITION_TIMEOUT", 60.0),
+        "max_connection_lifetime": _env_float("MEMGRAPH_MAX_CONNECTION_LIFETIME", 3600.0),
+        "keep_alive": _env_bool("MEMGRAPH_KEEP_ALIVE", True),
+    }
+    return f"bolt://{host}:{port}", pool_config
+
+# Errors that mean the connection itself is broken
+_CONNECTION_ERRORS = (ServiceUnavailable, SessionExpired, ConnectionError, OSError)
+
+# Min seconds between inline rechecks while disconnected
+_RECHECK_INTERVAL = 2.0
+
+def _clean_edge_rows(rows: List[Dict[str, Any]], with_weight: bool = True) -> List[Dict[str, Any]]:
+    data = []
+    for e in rows:
+        s = str(e.get('source', '')).strip()
+        t = str(e.get('target', '')).strip()
+        if not (s and t):
+            continue
+        row = {"source": s, "target": t}
+        if with_weight:
+            try: row["weight"] = int(e.get('weight', 1))
+            except (ValueError, TypeError): row["weight"] = 1
+        data.append(row)
+    return data
+
+def _prepare_rows(nodes: List[str], edges: List[Dict[str, Any]], prepared: bool) -> Tuple[List[str], List[Dict[str, Any]]]:
+    # prepared rows (GraphFrame.db_edge_rows) are already clean
+    if prepared:
+        return list(nodes), edges
+    return list(dict.fromkeys(str(n).strip() for n in nodes)), _clean_edge_rows(edges)
+
+def _as_weight(w: Any) -> int:
+    if type(w) is int:
+        return w
+    try:
+        return int(w)
+    except (ValueError, TypeError):
+        return 1
+
+def _write_counters() -> Dict[str, int]:
+    return {"nodes_created": 0, "nodes_deleted": 0, "relationships_created": 0, "relationships_deleted": 0, "properties_set": 0}
+
+def _add_counters(totals: Dict[str, int], summary) -> None:
+    counters = summary.counters
+    for key in totals:
+        totals[key] += getattr(counters, key, 0)
+
+def _chunks(items: List[Any], size: int) -> List[List[Any]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+# Isolated nodes come back with target = null
+_Q_LOAD_GRAPH = """
+MATCH (u:Node)
+OPTIONAL MATCH (u)-[r:LINK]->(v:Node)
+RETURN u.name as source, v.name as target, r.weight as weight
+"""
+_Q_LOAD_CONFIG = "MATCH (c:Config {id: 'main'}) RETURN c.is_directed as d, c.is_weighted as w, c.edge_storage as s"
+
+# Write queries, shared with AsyncGraphRepository
+_Q_CREATE_INDEX = "CREATE INDEX ON :Node(name)"
+_Q_CLEAR_GRAPH = "MATCH (n:Node) DETACH DELETE n"
+_Q_CLEAR_DATABASE = "MATCH (n) DETACH DELETE n"
+_Q_MERGE_NODES = "UNWIND $batch as name MERGE (:Node {name: name})"
+_Q_DELETE_NODES = "UNWIND $batch as name MATCH (n:Node {name: name}) DETACH DELETE n"
+_Q_CREATE_EDGES = """
+UNWIND $batch as e
+MATCH (u:Node {name: e.source})
+MATCH (v:Node {name: e.target})
+CREATE (u)-[:LINK {weight: e.weight}]->(v)
+"""
+_Q_DELETE_EDGES = """
+UNWIND $batch as e
+MATCH (:Node {name: e.source})-[r:LINK]->(:Node {name: e.target})
+DELETE r
+"""
+_Q_UPSERT_EDGES = """
+UNWIND $batch as e
+MATCH (u:Node {name: e.source})
+MATCH (v:Node {name: e.target})
+MERGE (u)-[r:LINK]->(v)
+SET r.weight = e.weight
+"""
+
+# Edge storage (Config.edge_storage): one LINK per arc, two per undirected pair (legacy),
+# or one per undirected pair from the smaller name to the larger
+EDGE_STORAGE_DIRECTED = "directed"
+EDGE_STORAGE_BOTH = "both"
+EDGE_STORAGE_SINGLE = "single"
+
+def _config_query(edge_storage: Optional[str]) -> str:
+    query = "MERGE (c:Config {id: 'main'}) SET c.is_directed = $d, c.is_weighted = $w"
+    return query + ", c.edge_storage = $s" if edge_storage else query
+
+class GraphColumns:
+    """Columnar graph read from a cursor; edge k is src[k] -> dst[k] with weights[k]."""
+
+    __slots__ = ("names", "index", "src", "dst", "weights", "config")
+
+    def __init__(self, names: List[str], index: Dict[str, int], src: array, dst: array, weights: array, config: Dict[str, Any]):
+        self.names = names
+        self.index = index
+        self.src = src
+        self.dst = dst
+        self.weights = weights
+        self.config = config
+
+    @classmethod
+    def empty(cls) -> "GraphColumns":
+        return cls([], {}, array('i'), array('i'), array('q'), {"is_directed": True, "is_weighted": True})
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.names)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.src)
+
+    def intern(self, name) -> int:
+        name = str(name)
+        i = self.index.get(name)
+        if i is None:
+            i = len(self.names)
+            self.index[name] = i
+            self.names.append(name)
+        return i
+
+    def add_row(self, source, target, weight) -> None:
+        # An empty target is an isolated node
+        if not source:
+            return
+        u = self.intern(source)
+        if not target:
+            return
+        self.src.append(u)
+        self.dst.append(self.intern(target))
+        self.weights.append(_as_weight(weight))
+
+    def set_config(self, record) -> None:
+        if record:
+            self.config["is_directed"] = record.get('d', True)
+            self.config["is_weighted"] = record.get('w', True)
+            self.config["edge_storage"] = record.get('s')
+
+    def fingerprint(self) -> str:
+        """Hash of what was read, so equal keys always mean equal DB content."""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(repr(sorted(self.config.items())).encode("utf-8"))
+        h.update("\0".join(self.names).encode("utf-8"))
+        for arr in (self.src, self.dst, self.weights):
+            h.update(arr.typecode.encode())
+            h.update(arr.tobytes())
+        return h.hexdigest()
+
+    def edge_rows(self) -> List[Dict[str, Any]]:
+        names = self.names
+        return [{"source": names[u], "target": names[v], "weight": w}
+                for u, v, w in zip(self.src, self.dst, self.weights)]
+
 class GraphRepository:
     _instance = None
     driver: Optional[Driver] = None
@@ -19,139 +213,153 @@ class GraphRepository:
 
     def _initialize(self) -> None:
         self.driver = None
-        host = os.getenv("MEMGRAPH_HOST", "memgraph-db")
-        uri = f"bolt://{host}:7687"
-        
-        try:
-            self.driver = GraphDatabase.driver(uri, auth=("", ""))
-            self.driver.verify_connectivity()
-            logger.info(f"Connected to Memgraph at {uri}")
-        except Exception as e:
-            logger.error(f"Connection Failed: {e}")
-            self.driver = None
+        self.uri, self.pool_config = _driver_settings()
+        self.heartbeat_interval = _env_float("MEMGRAPH_HEARTBEAT_INTERVAL", 30.0)
+        # Debounced background snapshots
+        self.snapshots = SnapshotScheduler(
+            self._create_snapshot,
+            interval=_env_float("SNAPSHOT_INTERVAL", 30.0),
+            max_changes=_env_int("SNAPSHOT_MAX_CHANGES", 1000),
+        )
+
+        self._healthy = False
+        self._last_check = 0.0
+        self._health_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._heartbeat = None
+
+        self.refresh_health()
+        if self.heartbeat_interval > 0:
+            self._heartbeat = threading.Thread(target=self._heartbeat_loop, name="memgraph-heartbeat", daemon=True)
+            self._heartbeat.start()
 
     def close(self) -> None:
+        # Always stop snapshots; only flush while connected
+        self.snapshots.stop(flush=self._healthy)
+        self._stop.set()
+        self._wake.set()
+        self._healthy = False
         if self.driver:
             self.driver.close()
 
     @property
     def is_connected(self) -> bool:
-        try:
-            if self.driver:
+        """Cached health, refreshed by the heartbeat; rechecked inline only while down."""
+        if not self._healthy and time.monotonic() - self._last_check >= _RECHECK_INTERVAL:
+            self.refresh_health()
+        return self._healthy
+
+    @property
+    def last_health_check(self) -> float:
+        return self._last_check
+
+    def refresh_health(self) -> bool:
+        """Real round trip; recreates the driver if the first attempt failed."""
+        with self._health_lock:
+            was_healthy = self._healthy
+            try:
+                if self.driver is None:
+                    self.driver = GraphDatabase.driver(self.uri, auth=("", ""), **self.pool_config)
                 self.driver.verify_connectivity()
-                return True
-        except Exception:
-            pass
-        return False
+                self._healthy = True
+            except Exception as e:
+                self._healthy = False
+                if was_healthy or self._last_check == 0.0:
+                    logger.error(f"Connection Failed: {e}")
+            self._last_check = time.monotonic()
+            if self._healthy and not was_healthy:
+                logger.info(f"Connected to Memgraph at {self.uri}")
+            return self._healthy
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop.is_set():
+            # Probe more often while disconnected
+            interval = self.heartbeat_interval if self._healthy else min(self.heartbeat_interval, 5.0)
+            self._wake.wait(interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            self.refresh_health()
+
+    def _note_failure(self, error: Exception) -> None:
+        if isinstance(error, _CONNECTION_ERRORS):
+            self._healthy = False
+            self._wake.set()
 
     def execute_query(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         if not self.driver:
             raise ConnectionError("Database driver is not initialized.")
-            
-        with self.driver.session() as session:
-            result = session.run(query, params or {})
-            return [record.data() for record in result]
+
+        try:
+            with self.driver.session() as session:
+                result = session.run(query, params or {})
+                return [record.data() for record in result]
+        except Exception as e:
+            self._note_failure(e)
+            raise
 
     def get_all_nodes_and_edges(self) -> Tuple[List[str], List[Dict[str, Any]], Dict[str, Any]]:
+        columns = self.load_columns()
+        return list(columns.names), columns.edge_rows(), columns.config
+
+    def load_columns(self, fetch_size: Optional[int] = None) -> GraphColumns:
+        """Stream nodes and edges into columns, fetch_size records at a time."""
         if not self.is_connected:
             raise ConnectionError("Not connected to Memgraph")
 
-        raw_nodes = self.execute_query("MATCH (n:Node) RETURN n.name as name")
-        nodes = [str(r['name']) for r in raw_nodes if r.get('name')]
-
-        q_edges = """
-        MATCH (u:Node)-[r:LINK]->(v:Node) 
-        RETURN u.name as source, v.name as target, r.weight as weight
-        """
-        raw_edges = self.execute_query(q_edges)
-        
-        edges = []
-        for r in raw_edges:
-            src = r.get('source')
-            tgt = r.get('target')
-            
-            try:
-                w = int(r.get('weight', 1))
-            except (ValueError, TypeError):
-                w = 1
-
-            if src and tgt:
-                edges.append({
-                    "source": str(src), 
-                    "target": str(tgt), 
-                    "weight": w 
-                })
-        
-        logger.info(f"📥 Loaded {len(nodes)} nodes, {len(edges)} edges.")
-        
-        # Load config
-        config = {"is_directed": True, "is_weighted": True}
+        fetch_size = fetch_size or _env_int("LOAD_FETCH_SIZE", 10_000)
+        columns = GraphColumns.empty()
         try:
-            res_conf = self.execute_query("MATCH (c:Config {id: 'main'}) RETURN c.is_directed as d, c.is_weighted as w")
-            if res_conf:
-                config["is_directed"] = res_conf[0].get('d', True)
-                config["is_weighted"] = res_conf[0].get('w', True)
+            with self.driver.session(fetch_size=fetch_size) as session:
+                for s, t, w in session.run(_Q_LOAD_GRAPH):
+                    columns.add_row(s, t, w)
+
+                # Load config
+                try:
+                    columns.set_config(session.run(_Q_LOAD_CONFIG).single())
+                except Exception as e:
+                    logger.warning(f"Could not load config: {e}")
         except Exception as e:
-            logger.warning(f"Could not load config: {e}")
+            self._note_failure(e)
+            raise
 
-        return nodes, edges, config
+        logger.info(f"📥 Loaded {columns.num_nodes} nodes, {columns.num_edges} edges.")
+        return columns
 
-    def sync_graph(self, nodes: List[str], edges: List[Dict[str, Any]]) -> Tuple[bool, str]:
+    def sync_graph(self, nodes: List[str], edges: List[Dict[str, Any]], prepared: bool = False) -> Tuple[bool, str]:
         if not self.is_connected:
              return False, "Not connected to Memgraph"
 
         try:
+            node_data, edge_data = _prepare_rows(nodes, edges, prepared)
             with self.driver.session() as session:
                 try:
-                    session.run("CREATE INDEX ON :Node(name)")
+                    session.run(_Q_CREATE_INDEX)
                 except Exception: 
                     pass 
+                counters = _write_counters()
                 with session.begin_transaction() as tx:
-                    if nodes:
-                        q_nodes = "UNWIND $batch as name MERGE (:Node {name: name})"
-                        node_data = [str(n).strip() for n in nodes]
-                        tx.run(q_nodes, {"batch": node_data})
-
-                    tx.run("MATCH ()-[r:LINK]->() DELETE r")
-
-                    if edges:
-                        q_edges = """
-                        UNWIND $batch as e
-                        MATCH (u:Node {name: e.source})
-                        MATCH (v:Node {name: e.target})
-                        CREATE (u)-[:LINK {weight: e.weight}]->(v)
-                        """
-                        edge_data = []
-                        for e in edges:
-                            s = str(e.get('source', '')).strip()
-                            t = str(e.get('target', '')).strip()
-                            w_raw = e.get('weight', 1)
-                            try: w = int(w_raw) 
-                            except: w = 1
-                            
-                            if s and t:
-                                edge_data.append({"source": s, "target": t, "weight": w})
-                        
-                        if edge_data:
-                            tx.run(q_edges, {"batch": edge_data})
+                    _add_counters(counters, tx.run(_Q_CLEAR_GRAPH).consume())
+
+                    if node_data:
+                        _add_counters(counters, tx.run(_Q_MERGE_NODES, {"batch": node_data}).consume())
+
+                    if edge_data:
+                        _add_counters(counters, tx.run(_Q_CREATE_EDGES, {"batch": edge_data}).consume())
                             
                     tx.commit()
             
-            try:
-                with self.driver.session() as session:
-                    session.run("CREATE SNAPSHOT")
-            except Exception as e:
-                logger.warning(f"Snapshot Failed (Data might be volatile): {e}")
+            self.snapshots.record(len(nodes) + len(edges))
 
+            # Verify from the write counters instead of rescanning
+            created = counters["relationships_created"]
             if edges:
-                check_q = "MATCH ()-[r:LINK]->() RETURN count(r) as c"
-                count_res = self.execute_query(check_q)
-                count = count_res[0]['c'] if count_res else 0
-                
-                if count == 0:
-                    return False, "Sync failed: Database confirmed 0 edges after write."
-                
-                verify_msg = f"(Verified: {count})"
+                if created == 0:
+                    return False, "Sync failed: Database reported 0 edges created."
+                if created < len(edge_data):
+                    logger.warning(f"Only {created}/{len(edge_data)} edges were created (missing endpoints?)")
+                verify_msg = f"(Verified: {created}/{len(edge_data)} edges created)"
             else:
                 verify_msg = "(Empty Graph)"
 
@@ -160,25 +368,311 @@ class GraphRepository:
             return True, msg
             
         except Exception as e:
+            self._note_failure(e)
             logger.error(f"Sync Error: {e}")
             return False, str(e)
 
-    def save_config(self, is_directed: bool, is_weighted: bool) -> None:
-        if not self.is_connected: return
+    def apply_changes(self, added_nodes: List[str], removed_nodes: List[str], upserted_edges: List[Dict[str, Any]], removed_edges: List[Dict[str, Any]]) -> Tuple[bool, str]:
+        # One transaction: delete edges, delete nodes, add nodes, upsert edges
+        if not self.is_connected:
+             return False, "Not connected to Memgraph"
+
+        try:
+            counters = _write_counters()
+            with self.driver.session() as session:
+                with session.begin_transaction() as tx:
+                    edge_del = _clean_edge_rows(removed_edges, False)
+                    if edge_del:
+                        _add_counters(counters, tx.run(_Q_DELETE_EDGES, {"batch": edge_del}).consume())
+
+                    if removed_nodes:
+                        _add_counters(counters, tx.run(_Q_DELETE_NODES,
+                                                       {"batch": [str(n).strip() for n in removed_nodes]}).consume())
+
+                    if added_nodes:
+                        _add_counters(counters, tx.run(_Q_MERGE_NODES,
+                                                       {"batch": [str(n).strip() for n in added_nodes]}).consume())
+
+                    edge_up = _clean_edge_rows(upserted_edges, True)
+                    if edge_up:
+                        _add_counters(counters, tx.run(_Q_UPSERT_EDGES, {"batch": edge_up}).consume())
+
+                    tx.commit()
+
+            self.snapshots.record(len(added_nodes) + len(removed_nodes) + len(edge_up) + len(edge_del))
+
+            # Each upsert sets one weight; fewer means a missing endpoint
+            if counters["properties_set"] < len(edge_up):
+                logger.warning(f"Only {counters['properties_set']}/{len(edge_up)} edge upserts matched both endpoints")
+            msg = (f"Synced changes: +{len(added_nodes)}/-{len(removed_nodes)} nodes, "
+                   f"+{len(edge_up)}/-{len(edge_del)} edges. "
+                   f"(Verified: +{counters['nodes_created']}/-{counters['nodes_deleted']} nodes, "
+                   f"+{counters['relationships_created']}/-{counters['relationships_deleted']} edges)")
+            logger.info(f"✅ {msg}")
+            return True, msg
+
+        except Exception as e:
+            self._note_failure(e)
+            logger.error(f"Sync Error: {e}")
+            return False, str(e)
+
+    def bulk_load(self, nodes: List[str], edges: List[Dict[str, Any]], chunk_size: Optional[int] = None,
+                  max_workers: Optional[int] = None, progress: Optional[ProgressCallback] = None,
+                  prepared: bool = False) -> Tuple[bool, str]:
+        """Chunked full rewrite; edges are written on up to max_workers parallel sessions.
+        Not atomic: the old graph is deleted first, so a failure can leave the DB empty or half-loaded."""
+        if not self.is_connected:
+             return False, "Not connected to Memgraph"
+
+        chunk_size = chunk_size or _env_int("BULK_CHUNK_SIZE", 10_000)
+        max_workers = max_workers or _env_int("BULK_MAX_WORKERS", 4)
+        report = progress or (lambda done, total, stage: None)
+
+        node_data, edge_data = _prepare_rows(nodes, edges, prepared)
+        node_chunks = _chunks(node_data, chunk_size)
+        edge_chunks = _chunks(edge_data, chunk_size)
+        total = len(node_chunks) + len(edge_chunks)
+
+        def write(query: str, batch: List[Any]):
+            with self.driver.session() as session:
+                return session.execute_write(lambda tx: tx.run(query, {"batch": batch}).consume().counters)
+
+        try:
+            with self.driver.session() as session:
+                try:
+                    session.run(_Q_CREATE_INDEX)
+                except Exception:
+                    pass
+            self._delete_in_chunks("MATCH (n:Node) WITH n LIMIT $limit DETACH DELETE n RETURN count(*) as c", chunk_size)
+            report(0, total, "Xóa dữ liệu cũ")
+
+            done = 0
+            nodes_created = edges_created = 0
+            for batch in node_chunks:
+                nodes_created += write("UNWIND $batch as name CREATE (:Node {name: name})", batch).nodes_created
+                done += 1
+                report(done, total, "Đỉnh")
+
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                futures = [pool.submit(write, _Q_CREATE_EDGES, batch) for batch in edge_chunks]
+                for future in as_completed(futures):
+                    edges_created += future.result().relationships_created
+                    done += 1
+                    report(done, total, "Cạnh")
+
+            self.snapshots.record(len(node_data) + len(edge_data))
+            if edges_created < len(edge_data):
+                logger.warning(f"Only {edges_created}/{len(edge_data)} edges were created (missing endpoints?)")
+            msg = (f"Bulk-loaded {len(node_data)} nodes, {len(edge_data)} edges in {total} chunks. "
+                   f"(Verified: {nodes_created} nodes, {edges_created} edges created)")
+            logger.info(f"✅ {msg}")
+            return True, msg
+
+        except Exception as e:
+            self._note_failure(e)
+            logger.error(f"Bulk Load Error: {e}")
+            return False, f"{e} (DB may be partially written)"
+
+    def load_csv(self, nodes: List[str], edges: List[Dict[str, Any]], progress: Optional[ProgressCallback] = None,
+                 prepared: bool = False) -> Tuple[bool, str]:
+        """Full rewrite via LOAD CSV; files go to MEMGRAPH_IMPORT_DIR (MEMGRAPH_IMPORT_DIR_DB inside the DB).
+        Not atomic, like bulk_load."""
+        local_dir = os.getenv("MEMGRAPH_IMPORT_DIR")
+        if not local_dir:
+            return False, "MEMGRAPH_IMPORT_DIR is not configured"
+        if not self.is_connected:
+             return False, "Not connected to Memgraph"
+        db_dir = os.getenv("MEMGRAPH_IMPORT_DIR_DB", local_dir)
+        report = progress or (lambda done, total, stage: None)
+
+        node_data, edge_data = _prepare_rows(nodes, edges, prepared)
+        tag = uuid.uuid4().hex
+        node_file, edge_file = f"nodes_{tag}.csv", f"edges_{tag}.csv"
+        os.makedirs(local_dir, exist_ok=True)
         try:
-            query = """
-            MERGE (c:Config {id: 'main'})
-            SET c.is_directed = $d, c.is_weighted = $w
+            with open(os.path.join(local_dir, node_file), "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["name"])
+                writer.writerows([n] for n in node_data)
+            with open(os.path.join(local_dir, edge_file), "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["source", "target", "weight"])
+                writer.writerows((e["source"], e["target"], e["weight"]) for e in edge_data)
+            report(1, 4, "Ghi file CSV")
+
+            with self.driver.session() as session:
+                try:
+                    session.run(_Q_CREATE_INDEX)
+                except Exception:
+                    pass
+            self._delete_in_chunks("MATCH (n:Node) WITH n LIMIT $limit DETACH DELETE n RETURN count(*) as c", _env_int("BULK_CHUNK_SIZE", 10_000))
+            report(2, 4, "Xóa dữ liệu cũ")
+
+            # Paths are generated here, so inlining them is safe
+            node_path = f"{db_dir.rstrip('/')}/{node_file}"
+            edge_path = f"{db_dir.rstrip('/')}/{edge_file}"
+            with self.driver.session() as session:
+                nodes_created = session.run(f'LOAD CSV FROM "{node_path}" WITH HEADER AS row CREATE (:Node {{name: row.name}})').consume().counters.nodes_created
+                report(3, 4, "Đỉnh")
+                edges_created = session.run(f"""
+                LOAD CSV FROM "{edge_path}" WITH HEADER AS row
+                MATCH (u:Node {{name: row.source}})
+                MATCH (v:Node {{name: row.target}})
+                CREATE (u)-[:LINK {{weight: toInteger(row.weight)}}]->(v)
+                """).consume().counters.relationships_created
+                report(4, 4, "Cạnh")
+
+            self.snapshots.record(len(nodes) + len(edges))
+            msg = (f"Loaded {len(nodes)} nodes, {len(edges)} edges via LOAD CSV. "
+                   f"(Verified: {nodes_created} nodes, {edges_created} edges created)")
+            logger.info(f"✅ {msg}")
+            return True, msg
+
+        except Exception as e:
+            self._note_failure(e)
+            logger.error(f"CSV Load Error: {e}")
+            return False, f"{e} (DB may be partially written)"
+        finally:
+            for name in (node_file, edge_file):
+                try:
+                    os.remove(os.path.join(local_dir, name))
+                except OSError:
+                    pass
+
+    def load_config(self) -> Dict[str, Any]:
+        columns = GraphColumns.empty()
+        try:
+            res = self.execute_query(_Q_LOAD_CONFIG)
+            columns.set_config(res[0] if res else None)
+        except Exception as e:
+            logger.warning(f"Could not load config: {e}")
+        return columns.config
+
+    def neighborhood_nodes(self, center: str, hops: int, skip: int = 0, limit: int = 500) -> List[str]:
+        """One page of nodes within hops of center, ordered by (depth, name)."""
+        hops = max(1, int(hops))
+        # The *BFS bound must be a literal; hops is an int
+        rows = self.execute_query(f"""
+        MATCH p = (:Node {{name: $center}})-[:LINK *BFS ..{hops}]-(v:Node)
+        RETURN v.name as name, size(p) as depth
+        ORDER BY depth, name
+        SKIP $skip LIMIT $limit
+        """, {"center": center, "skip": skip, "limit": limit})
+        return [str(r['name']) for r in rows if r.get('name') and r['name'] != center]
+
+    def edges_between(self, names: List[str]) -> List[Dict[str, Any]]:
+        rows = self.execute_query("""
+        UNWIND $names as name
+        MATCH (u:Node {name: name})-[r:LINK]->(v:Node)
+        WHERE v.name IN $names
+        RETURN u.name as source, v.name as target, r.weight as weight
+        """, {"names": names})
+        return [{"source": str(r['source']), "target": str(r['target']), "weight": _as_weight(r.get('weight'))}
+                for r in rows]
+
+    def edges_touching(self, names: List[str]) -> List[Dict[str, Any]]:
+        """Edges with at least one endpoint in names, each once."""
+        rows = self.execute_query("""
+        UNWIND $names as name
+        MATCH (:Node {name: name})-[r:LINK]-(:Node)
+        WITH DISTINCT r
+        RETURN startNode(r).name as source, endNode(r).name as target, r.weight as weight
+        """, {"names": names})
+        return [{"source": str(r['source']), "target": str(r['target']), "weight": _as_weight(r.get('weight'))}
+                for r in rows]
+
+    def fetch_adjacency(self, names: List[str], directed: bool = True) -> Dict[str, List[Tuple[str, Any]]]:
+        """Out-adjacency for a batch of nodes; missing nodes are absent from the result."""
+        adjacency: Dict[str, List[Tuple[str, Any]]] = {}
+        arrow = "->" if directed else "-"
+        rows = self.execute_query(f"""
+        UNWIND $names as name
+        MATCH (u:Node {{name: name}})
+        OPTIONAL MATCH (u)-[r:LINK]{arrow}(v:Node)
+        RETURN u.name as source, v.name as target, r.weight as weight
+        """, {"names": names})
+        for r in rows:
+            targets = adjacency.setdefault(str(r['source']), [])
+            if r.get('target'):
+                targets.append((str(r['target']), _as_weight(r.get('weight'))))
+        return adjacency
+
+    def bfs_order(self, start: str, directed: bool = True) -> List[str]:
+        """BFS order computed in Memgraph, sorted by depth then name (not adjacency order like the Python BFS)."""
+        arrow = "->" if directed else "-"
+        rows = self.execute_query(f"""
+        MATCH p = (s:Node {{name: $start}})-[:LINK *BFS]{arrow}(v:Node)
+        RETURN v.name as name, size(p) as depth
+        ORDER BY depth, name
+        """, {"start": start})
+        order = [start]
+        seen = {start}
+        for r in rows:
+            name = str(r['name'])
+            if name not in seen:
+                seen.add(name)
+                order.append(name)
+        return order
+
+    def shortest_path(self, start: str, end: str, weighted: bool = True, directed: bool = True) -> Tuple[List[str], Any]:
+        """Shortest path in Memgraph; ([], None) if unreachable."""
+        if start == end:
+            return [start], 0
+        arrow = "->" if directed else "-"
+        if weighted:
+            query = f"""
+            MATCH p = (:Node {{name: $start}})-[:LINK *WSHORTEST (r, n | r.weight) total]{arrow}(:Node {{name: $end}})
+            RETURN [n IN nodes(p) | n.name] as path, total as cost
             """
-            self.execute_query(query, {"d": is_directed, "w": is_weighted})
+        else:
+            query = f"""
+            MATCH p = (:Node {{name: $start}})-[:LINK *BFS]{arrow}(:Node {{name: $end}})
+            RETURN [n IN nodes(p) | n.name] as path, size(p) as cost
+            """
+        rows = self.execute_query(query, {"start": start, "end": end})
+        if not rows:
+            return [], None
+        return [str(n) for n in rows[0]['path']], rows[0]['cost']
+
+    def spanning_forest(self, start: Optional[str] = None, weighted: bool = True) -> List[Dict[str, Any]]:
+        """Minimum spanning forest via the graph_mst query module."""
+        return self.execute_query(
+            "CALL graph_mst.kruskal($start, $weighted) YIELD source, target, weight RETURN source, target, weight",
+            {"start": start, "weighted": weighted},
+        )
+
+    def count_graph(self) -> Tuple[int, int]:
+        nodes = self.execute_query("MATCH (n:Node) RETURN count(n) as c")
+        edges = self.execute_query("MATCH ()-[r:LINK]->() RETURN count(r) as c")
+        return (nodes[0]['c'] if nodes else 0), (edges[0]['c'] if edges else 0)
+
+    def _delete_in_chunks(self, query: str, limit: int) -> None:
+        while True:
+            with self.driver.session() as session:
+                res = session.execute_write(lambda tx: tx.run(query, {"limit": limit}).single())
+            if not res or res["c"] == 0:
+                break
+
+    def _create_snapshot(self) -> None:
+        with self.driver.session() as session:
+            session.run("CREATE SNAPSHOT").consume()
+
+    def save_config(self, is_directed: bool, is_weighted: bool, edge_storage: Optional[str] = None) -> None:
+        """edge_storage is only written after a full rewrite."""
+        if not self.is_connected: return
+        try:
+            self.execute_query(_config_query(edge_storage), {"d": is_directed, "w": is_weighted, "s": edge_storage})
         except Exception as e:
+            self._note_failure(e)
             logger.error(f"Save Config Error: {e}")
             return False, str(e)
 
     def clear_database(self) -> None:
         if not self.is_connected: return
         try:
-            self.execute_query("MATCH (n) DETACH DELETE n")
+            self.execute_query(_Q_CLEAR_DATABASE)
+            self.snapshots.record(1)
             logger.warning("Database Wiped.")
         except Exception as e:
+            self._note_failure(e)
             logger.error(f"Clear DB Error: {e}")
@@ -0,0 +1,83 @@
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotScheduler:
+    """Debounced snapshots on a background thread: every interval seconds or at max_changes."""
+
+    def __init__(self, create_snapshot: Callable[[], None], interval: float = 30.0, max_changes: int = 1000):
+        self._create = create_snapshot
+        self.interval = interval
+        self.max_changes = max_changes
+        self._pending = 0
+        self._last_snapshot: Optional[float] = None
+        self._last_attempt = time.monotonic()
+        self._failed = False
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._worker: Optional[threading.Thread] = None
+
+    @property
+    def pending_changes(self) -> int:
+        return self._pending
+
+    @property
+    def last_snapshot_time(self) -> Optional[float]:
+        return self._last_snapshot
+
+    def record(self, changes: int = 1) -> None:
+        if changes <= 0:
+            return
+        with self._cond:
+            self._pending += changes
+            if self._worker is None and not self._stopped:
+                self._worker = threading.Thread(target=self._run, name="memgraph-snapshot", daemon=True)
+                self._worker.start()
+            self._cond.notify()
+
+    def flush(self) -> bool:
+        with self._cond:
+            pending, self._pending = self._pending, 0
+        return self._snapshot(pending) if pending else True
+
+    def stop(self, flush: bool = True) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if flush:
+            self.flush()
+
+    def _due_in(self) -> float:
+        # After a failure, always wait a full interval
+        if self._pending >= self.max_changes and not self._failed:
+            return 0.0
+        return self._last_attempt + self.interval - time.monotonic()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopped and (self._pending == 0 or self._due_in() > 0):
+                    self._cond.wait(None if self._pending == 0 else self._due_in())
+                if self._stopped:
+                    return
+                pending, self._pending = self._pending, 0
+            self._snapshot(pending)
+
+    def _snapshot(self, pending: int) -> bool:
+        self._last_attempt = time.monotonic()
+        try:
+            self._create()
+        except Exception as e:
+            logger.warning(f"Snapshot Failed (Data might be volatile): {e}")
+            self._failed = True
+            with self._cond:
+                self._pending += pending
+            return False
+        self._failed = False
+        self._last_snapshot = time.time()
+        logger.info(f"📸 Snapshot created ({pending} changes)")
+        return True
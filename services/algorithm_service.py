@@ -1,6 +1,63 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
 from algorithms.traversal import BFS, DFS
 from algorithms.pathfinding import Dijkstra, BellmanFord
-from algorithms.mst import Prim, Kruskal
+from algorithms.astar import AStar
+from algorithms.all_pairs import AllPairs
+from algorithms.mst import Prim, Kruskal, Boruvka
+from services.server_backend import MemgraphBackend
+
+def _estimate_size(obj: Any) -> int:
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_estimate_size(k) + _estimate_size(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(_estimate_size(x) for x in obj)
+    return size
+
+class ResultCache:
+    """Size-bounded LRU of algorithm results, keyed by (graph version, ...)."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, Tuple[dict, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[dict]:
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is None:
+                return None
+            self._entries.move_to_end(key)
+            return dict(hit[0])
+
+    def put(self, key: Tuple, result: dict) -> None:
+        size = _estimate_size(result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (dict(result), size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def invalidate(self, version: Optional[Hashable] = None) -> None:
+        with self._lock:
+            if version is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            for key in [k for k in self._entries if k[0] == version]:
+                self._bytes -= self._entries.pop(key)[1]
 
 class AlgorithmFactory:
     _algos = {
@@ -8,11 +65,46 @@ class AlgorithmFactory:
         "DFS": DFS(),
         "Dijkstra": Dijkstra(),
         "Bellman-Ford": BellmanFord(),
+        "A*": AStar(),
+        "APSP": AllPairs(max_nodes=int(os.getenv("APSP_MAX_NODES", 5000))),
         "Prim": Prim(),
-        "Kruskal": Kruskal()
+        "Kruskal": Kruskal(),
+        "Borůvka": Boruvka()
     }
 
+    _results = ResultCache(int(os.getenv("ALGO_CACHE_MAX_BYTES", 64 * 1024 * 1024)))
+    _server = MemgraphBackend()
+
     @classmethod
     def get_algorithm(cls, name: str):
         key = name.split(" ")[0]
-        return cls._algos.get(key)
\ No newline at end of file
+        return cls._algos.get(key)
+
+    @classmethod
+    def run(cls, name: str, graph_version: Hashable, start_node: Optional[str], end_node: Optional[str],
+            is_directed: bool, is_weighted: bool, build_graph: Callable[[], Any],
+            graph_size: int = 0, db_in_sync: bool = False) -> Dict[str, Any]:
+        """build_graph is only called on a cache miss that the server backend does not take."""
+        algo_key = name.split(" ")[0]
+        key = (graph_version, algo_key, start_node, end_node, is_directed, is_weighted)
+        cached = cls._results.get(key)
+        if cached is not None:
+            return cached
+        algorithm = cls.get_algorithm(name)
+        if algorithm is None:
+            raise ValueError(f"Không có thuật toán: {name}")
+        res = None
+        if db_in_sync and cls._server.accepts(algo_key, graph_size, is_directed):
+            res = cls._server.execute(algo_key, start_node, end_node, is_directed, is_weighted)
+        if res is None:
+            res = algorithm.execute(build_graph(), start_node, end_node)
+        cls._results.put(key, res)
+        return dict(res)
+
+    @classmethod
+    def invalidate(cls, graph_version: Optional[Hashable] = None) -> None:
+        """Drop results and precomputed data for a graph version (all if None)."""
+        cls._results.invalidate(graph_version)
+        for algorithm in cls._algos.values():
+            if hasattr(algorithm, "invalidate"):
+                algorithm.invalidate(graph_version)
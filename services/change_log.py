@@ -0,0 +1,45 @@
+from typing import Any, Dict, List, Set, Tuple
+
+
+class GraphChangeLog:
+    """Node/edge changes since the last sync; full_rewrite means the next sync rewrites everything."""
+
+    def __init__(self):
+        self.added_nodes: Dict[str, None] = {}
+        self.removed_nodes: Set[str] = set()
+        self.upserted_edges: Dict[Tuple[str, str], Any] = {}
+        self.removed_edges: Set[Tuple[str, str]] = set()
+        self.full_rewrite: bool = True
+
+    def __bool__(self) -> bool:
+        return bool(self.added_nodes or self.removed_nodes or self.upserted_edges or self.removed_edges)
+
+    def add_node(self, name: str) -> None:
+        self.added_nodes[name] = None
+
+    def remove_node(self, name: str) -> None:
+        self.added_nodes.pop(name, None)
+        self.removed_nodes.add(name)
+        # DETACH DELETE drops its edges, so pending ones go too
+        for pair in [p for p in self.upserted_edges if name in p]:
+            del self.upserted_edges[pair]
+
+    def upsert_edge(self, source: str, target: str, weight: Any) -> None:
+        self.upserted_edges[(source, target)] = weight
+
+    def remove_edge(self, source: str, target: str) -> None:
+        self.upserted_edges.pop((source, target), None)
+        self.removed_edges.add((source, target))
+
+    def mark_full(self) -> None:
+        self.full_rewrite = True
+
+    def reset(self, full_rewrite: bool = False) -> None:
+        self.added_nodes.clear()
+        self.removed_nodes.clear()
+        self.upserted_edges.clear()
+        self.removed_edges.clear()
+        self.full_rewrite = full_rewrite
+
+    def edge_rows(self) -> List[Dict[str, Any]]:
+        return [{"source": s, "target": t, "weight": w} for (s, t), w in self.upserted_edges.items()]
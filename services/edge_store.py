@@ -0,0 +1,73 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+Pair = Tuple[str, str]
+
+
+class EdgeStore:
+    """Indexed, insertion-ordered list of edge dicts; one edge per (source, target)."""
+
+    def __init__(self, edges: Iterable[Dict[str, Any]] = ()):
+        self._edges: Dict[Pair, Dict[str, Any]] = {}
+        self._incidence: Dict[str, Set[Pair]] = {}
+        self.extend(edges)
+
+    def __len__(self) -> int:
+        return len(self._edges)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._edges.values())
+
+    def __contains__(self, pair: Pair) -> bool:
+        return pair in self._edges
+
+    def __repr__(self) -> str:
+        return f"EdgeStore({len(self._edges)} edges)"
+
+    def get(self, source: str, target: str) -> Optional[Dict[str, Any]]:
+        return self._edges.get((source, target))
+
+    def find(self, source: str, target: str, is_directed: bool = True) -> Optional[Dict[str, Any]]:
+        """Undirected lookups also match target -> source."""
+        edge = self._edges.get((source, target))
+        if edge is None and not is_directed:
+            edge = self._edges.get((target, source))
+        return edge
+
+    def upsert(self, source: str, target: str, weight: Any = 1) -> Dict[str, Any]:
+        pair = (source, target)
+        edge = self._edges.get(pair)
+        if edge is not None:
+            edge['weight'] = weight
+            return edge
+        edge = {"source": source, "target": target, "weight": weight}
+        self._edges[pair] = edge
+        self._incidence.setdefault(source, set()).add(pair)
+        self._incidence.setdefault(target, set()).add(pair)
+        return edge
+
+    def extend(self, edges: Iterable[Dict[str, Any]]) -> None:
+        for e in edges:
+            s, t = e.get('source'), e.get('target')
+            if s and t:
+                self.upsert(s, t, e.get('weight', 1))
+
+    def remove(self, source: str, target: str) -> Optional[Dict[str, Any]]:
+        pair = (source, target)
+        edge = self._edges.pop(pair, None)
+        if edge is not None:
+            for name in pair:
+                incident = self._incidence.get(name)
+                if incident is not None:
+                    incident.discard(pair)
+                    if not incident:
+                        del self._incidence[name]
+        return edge
+
+    def incident(self, name: str) -> List[Dict[str, Any]]:
+        return [self._edges[pair] for pair in self._incidence.get(name, ())]
+
+    def remove_node(self, name: str) -> List[Dict[str, Any]]:
+        return [self.remove(*pair) for pair in list(self._incidence.get(name, ()))]
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return [dict(e) for e in self._edges.values()]
@@ -0,0 +1,40 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class GraphBuildCache:
+    """Process-wide LRU of built graphs keyed by graph_key; returned graphs are shared, do not mutate."""
+
+    def __init__(self, max_entries: int = 8):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        with self._lock:
+            graph = self._entries.get(key)
+            if graph is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return graph
+            self.misses += 1
+        # Build outside the lock; concurrent misses may build twice
+        graph = build()
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[key] = graph
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return graph
+
+    def invalidate(self, graph_key: Optional[Hashable] = None) -> None:
+        """Drop graphs for graph_key (second key element), or all if None."""
+        with self._lock:
+            if graph_key is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[1] == graph_key]:
+                del self._entries[key]
@@ -0,0 +1,153 @@
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from algorithms.graph import CompactGraph
+from repositories.graph_repository import EDGE_STORAGE_BOTH, EDGE_STORAGE_DIRECTED, EDGE_STORAGE_SINGLE
+
+
+class ImportReport:
+    MAX_SAMPLES = 5
+
+    def __init__(self):
+        self.blank_nodes = 0
+        self.duplicate_nodes = 0
+        self.duplicate_edges = 0
+        self.dangling_edges = 0
+        self.bad_rows: List[Tuple[int, str]] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.blank_nodes or self.duplicate_nodes or self.duplicate_edges
+                    or self.dangling_edges or self.bad_rows)
+
+    def add_bad_rows(self, positions: np.ndarray, reason: str) -> None:
+        self.bad_rows.extend((int(i), reason) for i in positions)
+
+    def message(self) -> str:
+        parts = []
+        if self.bad_rows:
+            samples = ", ".join(f"#{i + 1} ({reason})" for i, reason in sorted(self.bad_rows)[:self.MAX_SAMPLES])
+            more = "..." if len(self.bad_rows) > self.MAX_SAMPLES else ""
+            parts.append(f"bỏ {len(self.bad_rows)} cạnh lỗi: {samples}{more}")
+        if self.dangling_edges:
+            parts.append(f"bỏ {self.dangling_edges} cạnh nối tới đỉnh không có trong danh sách")
+        if self.duplicate_edges:
+            parts.append(f"gộp {self.duplicate_edges} cạnh trùng (giữ trọng số cuối)")
+        if self.duplicate_nodes:
+            parts.append(f"bỏ {self.duplicate_nodes} đỉnh trùng")
+        if self.blank_nodes:
+            parts.append(f"bỏ {self.blank_nodes} đỉnh rỗng")
+        return "; ".join(parts)
+
+
+def _clean_names(values: pd.Series) -> pd.Series:
+    return values.where(values.notna(), "").astype(str).str.strip()
+
+
+class GraphFrame:
+    """Normalized columnar graph: unique names plus src/dst/weight edge columns."""
+
+    def __init__(self, names: pd.Index, edges: pd.DataFrame, report: ImportReport):
+        self.names = names
+        self.edges = edges
+        self.report = report
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.names)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.edges)
+
+    @classmethod
+    def from_records(cls, nodes: List[Any], edges: List[Any]) -> "GraphFrame":
+        """Validate and clean imported records; duplicate edges follow CompactGraph.from_lists."""
+        report = ImportReport()
+        edges = edges if isinstance(edges, list) else list(edges)
+
+        node_col = _clean_names(pd.Series(nodes, dtype=object))
+        blank = node_col == ""
+        report.blank_nodes = int(blank.sum())
+        node_col = node_col[~blank]
+        dup_nodes = node_col.duplicated()
+        report.duplicate_nodes = int(dup_nodes.sum())
+        names = pd.Index(node_col[~dup_nodes].to_numpy(), dtype=object)
+
+        is_record = np.fromiter((isinstance(e, dict) for e in edges), dtype=bool, count=len(edges))
+        report.add_bad_rows(np.flatnonzero(~is_record), "không phải object")
+        records = [e for e in edges if isinstance(e, dict)] if not is_record.all() else edges
+        frame = pd.DataFrame.from_records(records, columns=["source", "target", "weight"])
+        frame.index = np.flatnonzero(is_record)
+
+        source = _clean_names(frame["source"])
+        target = _clean_names(frame["target"])
+        missing = (source == "") | (target == "")
+        report.add_bad_rows(frame.index[missing], "thiếu source/target")
+
+        raw_weight = frame["weight"]
+        weight = pd.to_numeric(raw_weight, errors="coerce")
+        not_numeric = ((weight.isna() & raw_weight.notna()) | np.isinf(weight)) & ~missing
+        report.add_bad_rows(frame.index[not_numeric], "trọng số không hợp lệ")
+        weight = weight.fillna(1)
+        # The DB stores int64 weights
+        out_of_range = (weight.abs() >= 2.0 ** 63) & ~(missing | not_numeric)
+        report.add_bad_rows(frame.index[out_of_range], "trọng số vượt giới hạn int64")
+
+        keep = ~(missing | not_numeric | out_of_range)
+        src = pd.Categorical(source[keep], categories=names).codes.astype(np.int64)
+        dst = pd.Categorical(target[keep], categories=names).codes.astype(np.int64)
+        weight = weight[keep].to_numpy()
+
+        known = (src >= 0) & (dst >= 0)
+        report.dangling_edges = int((~known).sum())
+        src, dst, weight = src[known], dst[known], weight[known]
+        if not weight.size or np.array_equal(weight, np.trunc(weight)):
+            weight = weight.astype(np.int64)
+
+        table = pd.DataFrame({"src": src, "dst": dst, "weight": weight})
+        dup_edges = table.duplicated(["src", "dst"])
+        report.duplicate_edges = int(dup_edges.sum())
+        if report.duplicate_edges:
+            table["weight"] = table.groupby(["src", "dst"], sort=False)["weight"].transform("last")
+            table = table[~dup_edges]
+        return cls(names, table.reset_index(drop=True), report)
+
+    def node_list(self) -> List[str]:
+        return self.names.tolist()
+
+    def _named(self, src: np.ndarray, dst: np.ndarray, weight: np.ndarray) -> List[Dict[str, Any]]:
+        names = self.names.to_numpy()
+        return [{"source": s, "target": t, "weight": w}
+                for s, t, w in zip(names[src].tolist(), names[dst].tolist(), weight.tolist())]
+
+    def edge_records(self) -> List[Dict[str, Any]]:
+        e = self.edges
+        return self._named(e["src"].to_numpy(), e["dst"].to_numpy(), e["weight"].to_numpy())
+
+    def db_edge_rows(self, storage: str = EDGE_STORAGE_DIRECTED) -> List[Dict[str, Any]]:
+        """Memgraph edge rows for storage, matching GraphService._db_edge_rows."""
+        e = self.edges
+        src, dst = e["src"].to_numpy(), e["dst"].to_numpy()
+        weight = e["weight"].to_numpy().astype(np.int64)
+        if storage == EDGE_STORAGE_BOTH:
+            src, dst = np.stack([src, dst], axis=1).reshape(-1), np.stack([dst, src], axis=1).reshape(-1)
+            weight = np.repeat(weight, 2)
+            keep = ~pd.DataFrame({"s": src, "t": dst}).duplicated().to_numpy()
+            src, dst, weight = src[keep], dst[keep], weight[keep]
+        elif storage == EDGE_STORAGE_SINGLE:
+            names = self.names.to_numpy()
+            swap = names[src] > names[dst]
+            src, dst = np.where(swap, dst, src), np.where(swap, src, dst)
+            pairs = pd.DataFrame({"s": src, "t": dst, "w": weight})
+            dup = pairs.duplicated(["s", "t"]).to_numpy()
+            if dup.any():
+                weight = pairs.groupby(["s", "t"], sort=False)["w"].transform("last").to_numpy()
+                src, dst, weight = src[~dup], dst[~dup], weight[~dup]
+        return self._named(src, dst, weight)
+
+    def to_compact(self, is_directed: bool = True, is_weighted: bool = True) -> CompactGraph:
+        e = self.edges
+        return CompactGraph.from_columns(self.node_list(), e["src"].to_numpy(), e["dst"].to_numpy(),
+                                         e["weight"].to_numpy(), is_directed=is_directed, is_weighted=is_weighted)
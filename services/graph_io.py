@@ -0,0 +1,170 @@
+import csv
+import gzip
+import io
+import json
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple
+
+# ndjson: one {"config"}, {"node"} or {"source", "target", "weight"} object per line
+# csv: source,target,weight; an empty target declares a node; no config
+# json: legacy {"config", "nodes", "edges"}
+# gzip/zstd are detected from magic bytes; zstd needs the zstandard package
+FORMATS = ("ndjson", "csv", "json")
+COMPRESSIONS = ("", "gz", "zst")
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("Cần cài gói 'zstandard' để đọc/ghi file .zst.") from None
+    return zstandard
+
+
+def detect_format(file_name: str) -> Tuple[str, str]:
+    """'g.ndjson.gz' -> ('ndjson', 'gz')"""
+    parts = file_name.lower().rsplit(".", 2)
+    compression = parts.pop() if len(parts) > 1 and parts[-1] in ("gz", "zst") else ""
+    ext = parts[-1] if len(parts) > 1 else ""
+    if ext in ("jsonl", "ndjson"):
+        return "ndjson", compression
+    if ext in FORMATS:
+        return ext, compression
+    raise ValueError(f"Không nhận dạng được định dạng file '{file_name}' (hỗ trợ .json, .ndjson/.jsonl, .csv, kèm .gz/.zst).")
+
+
+def _open_binary(fileobj: BinaryIO) -> BinaryIO:
+    head = fileobj.read(4)
+    fileobj.seek(0)
+    if head.startswith(_GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=fileobj, mode="rb")
+    if head.startswith(_ZSTD_MAGIC):
+        return _zstandard().ZstdDecompressor().stream_reader(fileobj, closefd=False)
+    return fileobj
+
+
+def _parse_weight(value: str, line_no: int) -> Any:
+    if value == "":
+        return 1
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"Dòng {line_no}: trọng số '{value}' không phải số.") from None
+
+
+def _iter_ndjson(text: io.TextIOBase) -> Iterator[Tuple[str, Any]]:
+    for line_no, line in enumerate(text, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Dòng {line_no}: JSON không hợp lệ ({e.msg}).") from None
+        if not isinstance(obj, dict):
+            raise ValueError(f"Dòng {line_no}: mỗi dòng phải là một object JSON.")
+        if "config" in obj:
+            yield "config", obj["config"]
+        elif "node" in obj:
+            yield "node", str(obj["node"])
+        elif obj.get("source") and obj.get("target"):
+            yield "edge", {"source": str(obj["source"]), "target": str(obj["target"]), "weight": obj.get("weight", 1)}
+        else:
+            raise ValueError(f"Dòng {line_no}: cần 'node' hoặc 'source' và 'target'.")
+
+
+def _iter_csv(text: io.TextIOBase) -> Iterator[Tuple[str, Any]]:
+    reader = csv.reader(text)
+    header = [h.strip().lower() for h in next(reader, [])]
+    try:
+        si, ti = header.index("source"), header.index("target")
+    except ValueError:
+        raise ValueError("File CSV cần header có cột 'source' và 'target'.") from None
+    wi = header.index("weight") if "weight" in header else None
+
+    for row in reader:
+        line_no = reader.line_num
+        if not row:
+            continue
+        source = row[si].strip() if si < len(row) else ""
+        target = row[ti].strip() if ti < len(row) else ""
+        if not source:
+            raise ValueError(f"Dòng {line_no}: thiếu 'source'.")
+        if not target:
+            yield "node", source
+            continue
+        weight = row[wi].strip() if wi is not None and wi < len(row) else ""
+        yield "edge", {"source": source, "target": target, "weight": _parse_weight(weight, line_no)}
+
+
+def read_graph(fileobj: BinaryIO, file_name: str) -> Tuple[List[str], List[Dict[str, Any]], Dict[str, Any]]:
+    """Returns (nodes, edges, config); config is empty for CSV."""
+    fmt, _ = detect_format(file_name)
+    binary = _open_binary(fileobj)
+    if fmt == "json":
+        data = json.load(binary)
+        if not isinstance(data, dict):
+            raise ValueError("Lỗi định dạng: file JSON phải là một object.")
+        return data.get("nodes", []), data.get("edges", []), data.get("config", {})
+
+    text = io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+    rows = _iter_ndjson(text) if fmt == "ndjson" else _iter_csv(text)
+    nodes: Dict[str, None] = {}
+    edges: List[Dict[str, Any]] = []
+    config: Dict[str, Any] = {}
+    for kind, item in rows:
+        if kind == "edge":
+            nodes.setdefault(item["source"])
+            nodes.setdefault(item["target"])
+            edges.append(item)
+        elif kind == "node":
+            nodes.setdefault(item)
+        elif isinstance(item, dict):
+            config.update(item)
+    text.detach()
+    return list(nodes), edges, config
+
+
+def _open_writer(out: BinaryIO, compression: str) -> BinaryIO:
+    if compression == "gz":
+        return gzip.GzipFile(fileobj=out, mode="wb", compresslevel=6)
+    if compression == "zst":
+        return _zstandard().ZstdCompressor().stream_writer(out, closefd=False)
+    if compression:
+        raise ValueError(f"Kiểu nén không hỗ trợ: {compression}")
+    return out
+
+
+def write_graph(out: BinaryIO, nodes: List[str], edges: List[Dict[str, Any]], config: Dict[str, Any],
+                fmt: str = "ndjson", compression: str = "") -> None:
+    """Streams the graph to out line by line; out is left open."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Định dạng xuất không hỗ trợ: {fmt}")
+    binary = _open_writer(out, compression)
+    text = io.TextIOWrapper(binary, encoding="utf-8", newline="", write_through=False)
+    if fmt == "json":
+        # json.dump writes iterencode chunks
+        json.dump({"config": config, "nodes": list(nodes), "edges": list(edges)}, text, indent=2, ensure_ascii=False)
+    elif fmt == "ndjson":
+        text.write(json.dumps({"config": config}, ensure_ascii=False) + "\n")
+        for n in nodes:
+            text.write(json.dumps({"node": n}, ensure_ascii=False) + "\n")
+        for e in edges:
+            text.write(json.dumps({"source": e.get("source"), "target": e.get("target"),
+                                   "weight": e.get("weight", 1)}, ensure_ascii=False) + "\n")
+    else:
+        writer = csv.writer(text, lineterminator="\n")
+        writer.writerow(["source", "target", "weight"])
+        # Declare nodes first to keep order and isolated nodes
+        writer.writerows([n, "", ""] for n in nodes)
+        writer.writerows([e.get("source"), e.get("target"), e.get("weight", 1)] for e in edges)
+    text.flush()
+    text.detach()
+    if binary is not out:
+        binary.close()
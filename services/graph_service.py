@@ -1,65 +1,433 @@
-from typing import List, Tuple, Dict, Any, Optional
+from typing import BinaryIO, Hashable, List, Tuple, Dict, Any, Optional
 import networkx as nx
+import asyncio
+import functools
+import io
+import itertools
 import logging
-from repositories.graph_repository import GraphRepository
+import os
+from repositories.graph_repository import (
+    EDGE_STORAGE_BOTH, EDGE_STORAGE_DIRECTED, EDGE_STORAGE_SINGLE, GraphRepository, ProgressCallback,
+)
+from repositories.async_graph_repository import AsyncGraphRepository
+from algorithms.graph import CompactGraph
+from algorithms.lazy_graph import LazyGraph
+from services.algorithm_service import AlgorithmFactory
+from services.change_log import GraphChangeLog
+from services import graph_io
+from services.graph_frame import GraphFrame
+from services.graph_cache import GraphBuildCache
 
 logger = logging.getLogger(__name__)
 
+# Process-wide, so versions never collide between sessions
+_version_counter = itertools.count(1)
+# Per-build serial: id-keyed caches are only valid for the CompactGraph that assigned the ids
+_build_counter = itertools.count(1)
+
+def _canonical_pair(s: str, t: str) -> Tuple[str, str]:
+    return (s, t) if s <= t else (t, s)
+
 class GraphService:
+    # Built graphs shared across reruns and sessions
+    _builds = GraphBuildCache(int(os.getenv("GRAPH_CACHE_SIZE", 8)))
+
     def __init__(self):
         self.repository = GraphRepository()
         self.last_load_successful: bool = False
+        self.graph_version: int = next(_version_counter)
+        self.changes = GraphChangeLog()
+        self._async_repository: Optional[AsyncGraphRepository] = None
+        self._synced_directed: Optional[bool] = None
+        # Edge storage in the DB, and the one used for undirected full rewrites
+        self._synced_storage: Optional[str] = None
+        self.undirected_storage: str = os.getenv("UNDIRECTED_STORAGE", EDGE_STORAGE_SINGLE)
+        # Full rewrite strategy by row count (nodes + edges)
+        self.bulk_threshold: int = int(os.getenv("BULK_LOAD_THRESHOLD", 50_000))
+        self.csv_threshold: int = int(os.getenv("CSV_LOAD_THRESHOLD", 1_000_000))
+        # Partial loading for DBs with lazy_threshold rows or more
+        self.lazy_threshold: int = int(os.getenv("LAZY_LOAD_THRESHOLD", 500_000))
+        self.neighborhood_page_size: int = int(os.getenv("NEIGHBORHOOD_PAGE_SIZE", 500))
+        self.lazy_batch_size: int = int(os.getenv("LAZY_FETCH_BATCH", 256))
+        self.partial: bool = False
+        self.db_size: int = 0
+        self._neighborhood: Optional[Dict[str, Any]] = None
+        # Last imported GraphFrame, reused while graph_version is unchanged
+        self._frame: Optional[Tuple[int, GraphFrame]] = None
+        # Fingerprint of the DB content last loaded, while memory still equals it
+        self._db_fingerprint: Optional[str] = None
+
+    def _bump_version(self) -> None:
+        AlgorithmFactory.invalidate(self.graph_version)
+        self._builds.invalidate(self.graph_version)
+        self.graph_version = next(_version_counter)
+
+    @property
+    def graph_key(self) -> Hashable:
+        # Shared across sessions only while memory is exactly what was loaded
+        if self._db_fingerprint is not None and not self.changes and not self.changes.full_rewrite:
+            return ("db", self._db_fingerprint)
+        return self.graph_version
+
+    @property
+    def async_repository(self) -> AsyncGraphRepository:
+        if self._async_repository is None:
+            self._async_repository = AsyncGraphRepository()
+        return self._async_repository
+
+    def _mark_loaded(self, config: Dict[str, Any], fingerprint: Optional[str] = None) -> None:
+        self._bump_version()
+        self._db_fingerprint = fingerprint
+        self.changes.reset()
+        self._synced_directed = config.get('is_directed', True)
+        # DBs written before edge_storage store both directions
+        self._synced_storage = config.get('edge_storage') or (EDGE_STORAGE_DIRECTED if self._synced_directed else EDGE_STORAGE_BOTH)
+        self.last_load_successful = True
 
     def load_from_db(self) -> Tuple[List[str], List[Dict[str, Any]], Dict[str, Any]]:
         try:
-            nodes, edges, config = self.repository.get_all_nodes_and_edges()
-            self.last_load_successful = True
-            return nodes, edges, config
+            columns = self.repository.load_columns()
+            self._mark_loaded(columns.config, columns.fingerprint())
+            return list(columns.names), columns.edge_rows(), columns.config
+        except Exception as e:
+            self.last_load_successful = False
+            raise e
+
+    async def load_from_db_async(self) -> Tuple[List[str], List[Dict[str, Any]], Dict[str, Any]]:
+        """Async load_from_db."""
+        try:
+            columns = await self.async_repository.load_columns()
+            self._mark_loaded(columns.config, columns.fingerprint())
+            return list(columns.names), columns.edge_rows(), columns.config
+        except Exception as e:
+            self.last_load_successful = False
+            raise e
+
+    def load_compact_from_db(self) -> Tuple[CompactGraph, Dict[str, Any]]:
+        """Load the DB straight into a CompactGraph without per-edge dicts."""
+        try:
+            columns = self.repository.load_columns()
+            config = columns.config
+            self._mark_loaded(config, columns.fingerprint())
+        except Exception as e:
+            self.last_load_successful = False
+            raise e
+
+        is_directed = config.get('is_directed', True)
+        is_weighted = config.get('is_weighted', True)
+        G = CompactGraph.from_columns(columns.names, columns.src, columns.dst, columns.weights,
+                                      is_directed=is_directed, is_weighted=is_weighted, index=columns.index)
+        G.version = (self.graph_key, is_directed, is_weighted, next(_build_counter))
+        return G, config
+
+    def should_load_partial(self) -> bool:
+        if self.lazy_threshold <= 0:
+            return False
+        nodes, edges = self.repository.count_graph()
+        self.db_size = nodes + edges
+        return self.db_size >= self.lazy_threshold
+
+    def start_partial(self) -> Dict[str, Any]:
+        """Load only the config; the graph is filled by load_neighborhood."""
+        try:
+            config = self.repository.load_config()
+            self._mark_loaded(config)
         except Exception as e:
             self.last_load_successful = False
             raise e
+        self.partial = True
+        self._neighborhood = None
+        return config
+
+    def load_neighborhood(self, center: str, hops: int = 2) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """First page of the neighborhood around center, and the edges between them."""
+        if center not in self.repository.fetch_adjacency([center]):
+            raise ValueError(f"Không tìm thấy đỉnh '{center}' trong DB.")
+        page = self.repository.neighborhood_nodes(center, hops, 0, self.neighborhood_page_size)
+        nodes = [center] + page
+        edges = self.repository.edges_between(nodes)
+        self._bump_version()
+        self._neighborhood = {
+            "center": center,
+            "hops": hops,
+            "loaded": len(page),
+            "has_more": len(page) == self.neighborhood_page_size,
+            "known": set(nodes),
+        }
+        return nodes, edges
+
+    def expand_neighborhood(self) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """Next page: new nodes and their edges to already loaded nodes."""
+        nb = self._neighborhood
+        if not nb or not nb["has_more"]:
+            return [], []
+        page = self.repository.neighborhood_nodes(nb["center"], nb["hops"], nb["loaded"], self.neighborhood_page_size)
+        nb["loaded"] += len(page)
+        nb["has_more"] = len(page) == self.neighborhood_page_size
+
+        known = nb["known"]
+        new_nodes = [n for n in page if n not in known]
+        if not new_nodes:
+            return [], []
+        known.update(new_nodes)
+        # Only read edges of the new nodes
+        edges = [e for e in self.repository.edges_touching(new_nodes)
+                 if e["source"] in known and e["target"] in known]
+        self._bump_version()
+        return new_nodes, edges
+
+    @property
+    def neighborhood_has_more(self) -> bool:
+        return bool(self._neighborhood and self._neighborhood["has_more"])
+
+    def lazy_graph(self, is_directed: bool = True, is_weighted: bool = True) -> LazyGraph:
+        return LazyGraph(functools.partial(self.repository.fetch_adjacency, directed=is_directed),
+                         is_directed=is_directed, is_weighted=is_weighted, batch_size=self.lazy_batch_size)
+
+    def db_in_sync(self, is_directed: bool) -> bool:
+        """True when the DB matches the in-memory graph with no pending changes."""
+        return (self.last_load_successful and not self.changes.full_rewrite
+                and not self.changes and self._synced_directed == is_directed)
+
+    def _begin_sync(self, force: bool, is_directed: bool) -> Optional[Tuple[bool, str]]:
+        # The in-memory data changed whether or not the write succeeds
+        self._bump_version()
+        self._db_fingerprint = None
 
-    def sync_to_db(self, nodes: List[str], edges: List[Dict[str, Any]], is_directed: bool = True, is_weighted: bool = True, force: bool = False) -> Tuple[bool, str]:
         if not self.last_load_successful and not force:
             msg = "⚠️ Khóa an toàn: Không thể đồng bộ vì quá trình tải dữ liệu ban đầu thất bại. Sử dụng force=True để ghi đè."
             logger.warning(msg)
             return False, msg
+        if self.partial and self._needs_full_rewrite(is_directed, force) and not force:
+            msg = "⚠️ Khóa an toàn: Đang ở chế độ tải một phần, không thể ghi đè toàn bộ đồ thị trong DB bằng phần đã tải."
+            logger.warning(msg)
+            return False, msg
+        return None
+
+    def _storage(self, is_directed: bool) -> str:
+        return EDGE_STORAGE_DIRECTED if is_directed else self.undirected_storage
+
+    def _needs_full_rewrite(self, is_directed: bool, force: bool) -> bool:
+        # Migrate the storage once, except in partial mode
+        return (force or self.changes.full_rewrite or self._synced_directed != is_directed
+                or (not self.partial and self._synced_storage != self._storage(is_directed)))
 
-        edges_to_sync = list(edges)
-        if not is_directed:
-            augmented_edges = []
-            seen = set()
+    def _finish_sync(self, success: bool, is_directed: bool, full_rewrite: bool) -> None:
+        if success:
+            self.changes.reset()
+            self._synced_directed = is_directed
+            if full_rewrite:
+                self._synced_storage = self._storage(is_directed)
+            # After a full rewrite the DB holds the whole graph
+            if full_rewrite:
+                self.partial = False
+        elif full_rewrite:
+            # A failed rewrite leaves the DB unknown, so the next sync must rewrite it all
+            self.changes.mark_full()
+
+    def sync_to_db(self, nodes: List[str], edges: List[Dict[str, Any]], is_directed: bool = True, is_weighted: bool = True, force: bool = False, progress: Optional[ProgressCallback] = None, frame: Optional[GraphFrame] = None) -> Tuple[bool, str]:
+        """frame: the GraphFrame nodes/edges came from; full rewrites use its rows as is."""
+        blocked = self._begin_sync(force, is_directed)
+        if blocked:
+            return blocked
+        self._keep_frame(frame)
+
+        full = self._needs_full_rewrite(is_directed, force)
+        storage = self._storage(is_directed)
+        self.repository.save_config(is_directed, is_weighted, storage if full else None)
+
+        if full and frame is not None:
+            success, msg = self._full_rewrite(frame.node_list(), frame.db_edge_rows(storage), progress, prepared=True)
+        elif full:
+            success, msg = self._full_rewrite(nodes, self._db_edge_rows(edges, storage), progress)
+        else:
+            success, msg = self._sync_changes(edges, is_directed)
+
+        self._finish_sync(success, is_directed, full)
+        return success, msg
+
+    async def sync_to_db_async(self, nodes: List[str], edges: List[Dict[str, Any]], is_directed: bool = True, is_weighted: bool = True, force: bool = False, progress: Optional[ProgressCallback] = None, frame: Optional[GraphFrame] = None) -> Tuple[bool, str]:
+        """Async sync_to_db; bulk loads run in asyncio.to_thread."""
+        blocked = self._begin_sync(force, is_directed)
+        if blocked:
+            return blocked
+        self._keep_frame(frame)
+
+        repo = self.async_repository
+        full = self._needs_full_rewrite(is_directed, force)
+        storage = self._storage(is_directed)
+        await repo.save_config(is_directed, is_weighted, storage if full else None)
+
+        if full:
+            prepared = frame is not None
+            if prepared:
+                nodes, rows = frame.node_list(), frame.db_edge_rows(storage)
+            else:
+                rows = self._db_edge_rows(edges, storage)
+            if len(nodes) + len(rows) >= self.bulk_threshold:
+                success, msg = await asyncio.to_thread(self._full_rewrite, nodes, rows, progress, prepared)
+            else:
+                success, msg = await repo.sync_graph(nodes, rows, prepared=prepared)
+        else:
+            success, msg = await repo.apply_changes(*self._change_rows(edges, is_directed))
+
+        self._finish_sync(success, is_directed, full)
+        return success, msg
+
+    def _full_rewrite(self, nodes: List[str], edges: List[Dict[str, Any]], progress: Optional[ProgressCallback], prepared: bool = False) -> Tuple[bool, str]:
+        rows = len(nodes) + len(edges)
+        if rows >= self.csv_threshold and os.getenv("MEMGRAPH_IMPORT_DIR"):
+            return self.repository.load_csv(nodes, edges, progress=progress, prepared=prepared)
+        if rows >= self.bulk_threshold:
+            return self.repository.bulk_load(nodes, edges, progress=progress, prepared=prepared)
+        return self.repository.sync_graph(nodes, edges, prepared=prepared)
+
+    def _keep_frame(self, frame: Optional[GraphFrame]) -> None:
+        # Call after _bump_version
+        self._frame = (self.graph_version, frame) if frame is not None else None
+
+    def _db_edge_rows(self, edges: List[Dict[str, Any]], storage: str) -> List[Dict[str, Any]]:
+        if storage == EDGE_STORAGE_SINGLE:
+            return self._canonical_undirected(edges)
+        if storage == EDGE_STORAGE_BOTH:
+            return self._augment_undirected(edges)
+        return list(edges)
+
+    def _canonical_undirected(self, edges: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """One edge per pair, smaller name first; duplicates keep the last weight."""
+        pairs: Dict[Tuple[str, str], Any] = {}
+        for e in edges:
+            s, t = e.get('source'), e.get('target')
+            if not (s and t):
+                continue
+            pairs[_canonical_pair(str(s).strip(), str(t).strip())] = e.get('weight', 1)
+        return [{"source": s, "target": t, "weight": w} for (s, t), w in pairs.items()]
+
+    def _augment_undirected(self, edges: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        augmented_edges = []
+        seen = set()
+        
+        for e in edges:
+            s, t, w = e.get('source'), e.get('target'), e.get('weight', 1)
             
-            for e in edges_to_sync:
-                s, t, w = e.get('source'), e.get('target'), e.get('weight', 1)
-                
-                sig = (s, t)
-                if sig not in seen:
-                    augmented_edges.append(e)
-                    seen.add(sig)
-                
-                rev_sig = (t, s)
-                if rev_sig not in seen and s != t: 
-                    rev_edge = e.copy()
-                    rev_edge['source'] = t
-                    rev_edge['target'] = s
-                    augmented_edges.append(rev_edge)
-                    seen.add(rev_sig)
+            sig = (s, t)
+            if sig not in seen:
+                augmented_edges.append(e)
+                seen.add(sig)
             
-            edges_to_sync = augmented_edges
+            rev_sig = (t, s)
+            if rev_sig not in seen and s != t: 
+                rev_edge = e.copy()
+                rev_edge['source'] = t
+                rev_edge['target'] = s
+                augmented_edges.append(rev_edge)
+                seen.add(rev_sig)
+        
+        return augmented_edges
+
+    def _sync_changes(self, edges: List[Dict[str, Any]], is_directed: bool) -> Tuple[bool, str]:
+        return self.repository.apply_changes(*self._change_rows(edges, is_directed))
+
+    def _change_rows(self, edges: List[Dict[str, Any]], is_directed: bool) -> Tuple[List[str], List[str], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        # Undirected pairs are only deleted once neither direction remains
+        changes = self.changes
+        upserts = changes.edge_rows()
+        removals = [{"source": s, "target": t} for s, t in changes.removed_edges]
+        if not is_directed and self._synced_storage == EDGE_STORAGE_SINGLE:
+            upserts = self._canonical_undirected(upserts)
+            if removals:
+                remaining = {_canonical_pair(e['source'], e['target']) for e in edges if e.get('source') and e.get('target')}
+                pairs = {_canonical_pair(r["source"], r["target"]) for r in removals}
+                removals = [{"source": s, "target": t} for s, t in pairs if (s, t) not in remaining]
+        elif not is_directed:
+            upserts += [{"source": e["target"], "target": e["source"], "weight": e["weight"]} for e in upserts if e["source"] != e["target"]]
+            if removals:
+                remaining = set()
+                for e in edges:
+                    remaining.add((e.get('source'), e.get('target')))
+                    remaining.add((e.get('target'), e.get('source')))
+                pairs = {(r["source"], r["target"]) for r in removals}
+                pairs |= {(t, s) for s, t in pairs}
+                removals = [{"source": s, "target": t} for s, t in pairs if (s, t) not in remaining]
+        return list(changes.added_nodes), list(changes.removed_nodes), upserts, removals
+
+    # Every edit bumps the version, synced or not
+    def record_node_added(self, name: str) -> None:
+        self._bump_version()
+        self.changes.add_node(name)
+        if self._neighborhood:
+            self._neighborhood["known"].add(name)
+
+    def record_node_removed(self, name: str) -> None:
+        self._bump_version()
+        self.changes.remove_node(name)
+        if self._neighborhood:
+            self._neighborhood["known"].discard(name)
 
-        self.repository.save_config(is_directed, is_weighted)
+    def record_edge_upserted(self, source: str, target: str, weight: Any) -> None:
+        self._bump_version()
+        self.changes.upsert_edge(source, target, weight)
 
-        return self.repository.sync_graph(nodes, edges_to_sync)
+    def record_edge_removed(self, source: str, target: str) -> None:
+        self._bump_version()
+        self.changes.remove_edge(source, target)
+
+    def mark_full_sync(self) -> None:
+        self._bump_version()
+        self.changes.mark_full()
 
     def clear_db(self) -> None:
+        self._bump_version()
         self.repository.clear_database()
+        self._db_fingerprint = None
+        self.changes.reset()
+        self.partial = False
+        self._neighborhood = None
+
+    def check_consistency(self, nodes: List[str], edges: List[Dict[str, Any]], is_directed: bool = True, deep: bool = False) -> Tuple[bool, str]:
+        """Compare DB counts with the in-memory graph; deep=True compares every edge and weight."""
+        expected_nodes = {str(n).strip() for n in nodes}
+        expected_edges: Dict[Tuple[str, str], int] = {}
+        storage = self._synced_storage if self._synced_directed == is_directed else self._storage(is_directed)
+        for e in self._db_edge_rows(edges, storage):
+            s, t = str(e.get('source', '')).strip(), str(e.get('target', '')).strip()
+            if not (s and t):
+                continue
+            try: w = int(e.get('weight', 1))
+            except (ValueError, TypeError): w = 1
+            expected_edges[(s, t)] = w
+
+        if not deep:
+            db_nodes, db_edges = self.repository.count_graph()
+            ok = db_nodes == len(expected_nodes) and db_edges == len(expected_edges)
+            msg = f"DB: {db_nodes} đỉnh, {db_edges} cạnh - bộ nhớ: {len(expected_nodes)} đỉnh, {len(expected_edges)} cạnh."
+            return ok, msg
+
+        columns = self.repository.load_columns()
+        names = columns.names
+        db_edges = {(names[u], names[v]): w for u, v, w in zip(columns.src, columns.dst, columns.weights)}
+        missing_nodes = len(expected_nodes - set(names))
+        extra_nodes = len(set(names) - expected_nodes)
+        missing_edges = sum(1 for pair in expected_edges if pair not in db_edges)
+        extra_edges = sum(1 for pair in db_edges if pair not in expected_edges)
+        wrong_weights = sum(1 for pair, w in expected_edges.items() if pair in db_edges and db_edges[pair] != w)
+        ok = not (missing_nodes or extra_nodes or missing_edges or extra_edges or wrong_weights or len(db_edges) != columns.num_edges)
+        msg = (f"Đỉnh thiếu/thừa: {missing_nodes}/{extra_nodes}, cạnh thiếu/thừa: {missing_edges}/{extra_edges}, "
+               f"sai trọng số: {wrong_weights}, cạnh trùng trong DB: {columns.num_edges - len(db_edges)}.")
+        return ok, msg
+
+    def snapshot_status(self) -> Dict[str, Any]:
+        snapshots = self.repository.snapshots
+        return {
+            "last_snapshot": snapshots.last_snapshot_time,
+            "pending_changes": snapshots.pending_changes,
+        }
 
     def to_json(self, nodes: List[str], edges: List[Dict[str, Any]], config: Dict[str, Any]) -> Dict[str, Any]:
         return {
             "config": config,
             "nodes": nodes,
-            "edges": edges
+            "edges": list(edges)
         }
 
     def from_json(self, data: Dict[str, Any]) -> Tuple[List[str], List[Dict[str, Any]], Dict[str, Any]]:
@@ -73,7 +441,27 @@ class GraphService:
         
         return nodes, edges, config
     
+    def normalize(self, nodes: List[Any], edges: List[Any]) -> GraphFrame:
+        """See GraphFrame.from_records; pass the frame on to sync_to_db."""
+        return GraphFrame.from_records(nodes, edges)
+
+    def from_file(self, fileobj: BinaryIO, file_name: str) -> Tuple[List[str], List[Dict[str, Any]], Dict[str, Any]]:
+        """Streaming JSON / NDJSON / CSV reader, see services.graph_io."""
+        nodes, edges, config = graph_io.read_graph(fileobj, file_name)
+        return self.from_json({"nodes": nodes, "edges": edges, "config": config})
+
+    def export_bytes(self, nodes: List[str], edges: List[Dict[str, Any]], config: Dict[str, Any],
+                     fmt: str = "ndjson", compression: str = "") -> bytes:
+        out = io.BytesIO()
+        graph_io.write_graph(out, nodes, edges, config, fmt, compression)
+        return out.getvalue()
+
     def build_networkx_graph(self, nodes: List[str], edges: List[Dict[str, Any]], is_directed: bool = True, is_weighted: bool = True) -> nx.Graph:
+        """Cached by graph_key; do not mutate the result."""
+        return self._builds.get_or_build(("nx", self.graph_key, is_directed, is_weighted),
+                                         lambda: self._networkx_graph(nodes, edges, is_directed, is_weighted))
+
+    def _networkx_graph(self, nodes: List[str], edges: List[Dict[str, Any]], is_directed: bool, is_weighted: bool) -> nx.Graph:
         G = nx.DiGraph() if is_directed else nx.Graph()
         G.add_nodes_from(nodes)
         
@@ -85,4 +473,18 @@ class GraphService:
             if u and v:
                 G.add_edge(u, v, weight=w)
                 
-        return G
\ No newline at end of file
+        return G
+
+    def build_compact_graph(self, nodes: List[str], edges: List[Dict[str, Any]], is_directed: bool = True, is_weighted: bool = True) -> CompactGraph:
+        """Cached by graph_key; do not mutate the result."""
+        key = self.graph_key
+        return self._builds.get_or_build(("compact", key, is_directed, is_weighted),
+                                         lambda: self._compact_graph(key, nodes, edges, is_directed, is_weighted))
+
+    def _compact_graph(self, key: Hashable, nodes: List[str], edges: List[Dict[str, Any]], is_directed: bool, is_weighted: bool) -> CompactGraph:
+        if self._frame is not None and self._frame[0] == self.graph_version:
+            G = self._frame[1].to_compact(is_directed=is_directed, is_weighted=is_weighted)
+        else:
+            G = CompactGraph.from_lists(nodes, edges, is_directed=is_directed, is_weighted=is_weighted)
+        G.version = (key, is_directed, is_weighted, next(_build_counter))
+        return G
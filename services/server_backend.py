@@ -0,0 +1,66 @@
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from repositories.graph_repository import GraphRepository
+
+logger = logging.getLogger(__name__)
+
+
+class MemgraphBackend:
+    """Runs supported algorithms inside Memgraph above SERVER_ALGO_THRESHOLD (<= 0 disables)."""
+
+    # Directed Prim follows out-arcs only, which the module does not match
+    _UNDIRECTED_ONLY = {"Prim"}
+    _SUPPORTED = {"BFS", "Dijkstra", "Prim", "Kruskal"}
+
+    def __init__(self, threshold: Optional[int] = None, repository: Optional[GraphRepository] = None):
+        self.threshold = threshold if threshold is not None else int(os.getenv("SERVER_ALGO_THRESHOLD", 200_000))
+        self._repository = repository
+
+    @property
+    def repository(self) -> GraphRepository:
+        if self._repository is None:
+            self._repository = GraphRepository()
+        return self._repository
+
+    def accepts(self, name: str, graph_size: int, is_directed: bool) -> bool:
+        if self.threshold <= 0 or graph_size < self.threshold:
+            return False
+        if name in self._UNDIRECTED_ONLY and is_directed:
+            return False
+        return name in self._SUPPORTED
+
+    def execute(self, name: str, start_node: Optional[str], end_node: Optional[str],
+                is_directed: bool, is_weighted: bool) -> Optional[Dict[str, Any]]:
+        """None means fall back to the Python implementation."""
+        repo = self.repository
+        if not repo.is_connected:
+            return None
+        try:
+            if name == "BFS":
+                path = repo.bfs_order(start_node, directed=is_directed)
+                return {
+                    "path_nodes": path,
+                    "type": "traversal",
+                    "msg": f"BFS duyệt {len(path)} đỉnh (Memgraph *BFS, cùng tầng sắp theo tên nên thứ tự có thể khác bản Python)"
+                }
+            if name == "Dijkstra":
+                path, cost = repo.shortest_path(start_node, end_node, weighted=is_weighted, directed=is_directed)
+                return {
+                    "path_nodes": path,
+                    "cost": cost if cost is not None else 0,
+                    "type": "path",
+                    "msg": "Dijkstra (Memgraph *WSHORTEST)" if is_weighted else "Dijkstra (Memgraph *BFS)"
+                }
+            if name in ("Prim", "Kruskal"):
+                rows = repo.spanning_forest(start_node if name == "Prim" else None, weighted=is_weighted)
+                return {
+                    "mst_edges": [(str(r['source']), str(r['target'])) for r in rows],
+                    "cost": sum(r['weight'] for r in rows),
+                    "type": "mst",
+                    "msg": f"Thuật toán {name} (Memgraph graph_mst)"
+                }
+        except Exception as e:
+            logger.warning(f"Server-side {name} failed, falling back to Python: {e}")
+        return None
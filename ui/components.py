@@ -58,6 +58,7 @@ class Components:
                         clean_name = str(new_name).strip()
                         if clean_name not in session_state.nodes:
                             session_state.nodes.append(clean_name)
+                            session_state.graph_service.record_node_added(clean_name)
                             session_state.dirty = True 
                             on_change_callback()
                 
@@ -76,10 +77,8 @@ class Components:
                     
                     def del_n(idx=i, name=n):
                         session_state.nodes.pop(idx)
-                        session_state.edges = [
-                            e for e in session_state.edges 
-                            if e.get('source') != name and e.get('target') != name
-                        ]
+                        session_state.edges.remove_node(name)
+                        session_state.graph_service.record_node_removed(name)
                         session_state.dirty = True 
                         on_change_callback()
                         
@@ -106,15 +105,18 @@ class Components:
                     w = st.session_state.get("input_edge_w", 1) if is_weighted else 1
                     
                     if s and d:
-                        new_edge = {
-                            "source": str(s).strip(),
-                            "target": str(d).strip(),
-                            "weight": int(w)
-                        }
-                        if new_edge not in session_state.edges:
-                            session_state.edges.append(new_edge)
-                            session_state.dirty = True 
-                            on_change_callback()
+                        s, d, w = str(s).strip(), str(d).strip(), int(w)
+                        # One edge per pair: re-adding updates the weight
+                        existing = session_state.edges.find(s, d, is_directed)
+                        if existing is None:
+                            existing = session_state.edges.upsert(s, d, w)
+                        elif is_weighted and existing.get('weight') != w:
+                            existing = session_state.edges.upsert(existing['source'], existing['target'], w)
+                        else:
+                            return
+                        session_state.graph_service.record_edge_upserted(existing['source'], existing['target'], existing['weight'])
+                        session_state.dirty = True 
+                        on_change_callback()
                         
                 c4.form_submit_button("Thêm", type="primary", on_click=add_e, use_container_width=True)
 
@@ -144,8 +146,9 @@ class Components:
                     else:
                         r2.write("")
                     
-                    def del_e(idx=i):
-                        session_state.edges.pop(idx)
+                    def del_e(pair=(src, dst)):
+                        session_state.edges.remove(*pair)
+                        session_state.graph_service.record_edge_removed(str(pair[0]).strip(), str(pair[1]).strip())
                         session_state.dirty = True 
                         on_change_callback()
                         